@@ -0,0 +1,170 @@
+""" On-disk cache of compiled programs
+Entries are keyed by a hash of the program source, of the compiler
+itself and of the compile options that affect the output, and hold the
+.ami text together with the diagnostics, so that an unchanged file can
+be "compiled" by copying its entry.
+
+Every entry is written to a temporary file and renamed into place, so
+several processes can share a cache directory.  The cache is kept below
+a size limit by trim(), which drops the least recently used entries.
+Walking the directory to find their size costs more than most compiles,
+so the total is kept in the file SIZE_FILE in the directory instead:
+put() only counts the bytes it stores, and record_size() adds them to
+the total, once per run of the compiler (batch workers hand theirs back
+with their results), and trims only when that goes over the limit.
+Runs that store nothing, because every file was in the cache, leave the
+directory alone.  Processes recording at the same time may lose each
+other's additions; each trim() counts the entries afresh.
+"""
+import os
+import glob
+import json
+import hashlib
+import tempfile
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# trim() leaves this much of the limit in use, so that it isn't run again
+# after every entry stored
+TRIM_FRACTION = 0.9
+# file in the cache directory holding the size of its entries, in bytes
+SIZE_FILE = 'size'
+
+_compiler_version = None
+
+def compiler_version():
+  '''Hash of the compiler's own source files: any change to the compiler
+     gives a new version and so invalidates every cached entry.'''
+  global _compiler_version
+  if _compiler_version is None:
+    h = hashlib.sha1()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(glob.glob(os.path.join(here, '*.py'))):
+      with open(name, 'rb') as f:
+        h.update(os.path.basename(name))
+        h.update(f.read())
+    _compiler_version = h.hexdigest()
+  return _compiler_version
+
+class Cache(object):
+  """A cache directory holding at most max_size bytes of entries.
+     options is a string naming the compile options that change the
+     output; entries made with other options are not reused."""
+  def __init__(self, directory, max_size=DEFAULT_MAX_SIZE, options=''):
+    self.directory = directory
+    self.max_size = max_size
+    self.options = options
+    # bytes of the entries put() stored that are not yet in SIZE_FILE
+    self.stored = 0
+
+  def key(self, source):
+    h = hashlib.sha1(compiler_version())
+    h.update(self.options)
+    h.update('\0')
+    h.update(source)
+    return h.hexdigest()
+
+  def path(self, key):
+    return os.path.join(self.directory, key[:2], key[2:])
+
+  def get(self, source):
+    '''Returns (success, diagnostics, program) for source, or None if
+       it is not in the cache.'''
+    path = self.path(self.key(source))
+    try:
+      with open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        program = f.read()
+    except (IOError, ValueError):
+      return None
+    # mark as recently used
+    try:
+      os.utime(path, None)
+    except OSError:
+      pass
+    diagnostics = [tuple(d) for d in header['diagnostics']]
+    if not header['success']:
+      program = None
+    return (header['success'], diagnostics, program)
+
+  def put(self, source, success, diagnostics, program):
+    path = self.path(self.key(source))
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+      try:
+        os.makedirs(directory)
+      except OSError:
+        # somebody else created it in the meantime
+        if not os.path.isdir(directory):
+          raise
+    header = json.dumps({'success': success, 'diagnostics': diagnostics})
+    self.write_file(path, header + '\n', program or '')
+    self.stored += len(header) + 1 + len(program or '')
+
+  def write_file(self, path, *data):
+    '''Writes the strings data to path by way of a temporary file'''
+    (fd, tmpname) = tempfile.mkstemp(dir=os.path.dirname(path),
+                                     prefix='.tmp')
+    try:
+      with os.fdopen(fd, 'wb') as f:
+        for part in data:
+          f.write(part)
+      os.rename(tmpname, path)
+    except:
+      os.unlink(tmpname)
+      raise
+
+  def take_stored(self):
+    '''Returns the bytes put() stored since the last call, for the
+       process that records them (see record_size())'''
+    stored = self.stored
+    self.stored = 0
+    return stored
+
+  def record_size(self):
+    '''Adds the bytes put() stored to the size in SIZE_FILE, trimming the
+       cache if that goes over max_size or there is no size yet'''
+    if not self.stored:
+      return
+    size = None
+    try:
+      with open(os.path.join(self.directory, SIZE_FILE), 'rb') as f:
+        size = int(f.read()) + self.stored
+    except (IOError, ValueError):
+      pass
+    self.stored = 0
+    if size is None or size > self.max_size:
+      self.trim()
+    else:
+      self.write_file(os.path.join(self.directory, SIZE_FILE), str(size))
+
+  def trim(self):
+    '''If the cache is over max_size bytes, removes the least recently
+       used entries until it is down to TRIM_FRACTION of that, and
+       records the size left in SIZE_FILE.'''
+    entries = []
+    total = 0
+    for (dirpath, dirnames, filenames) in os.walk(self.directory):
+      if dirpath == self.directory:
+        # entries are all in subdirectories; SIZE_FILE is here
+        continue
+      for name in filenames:
+        if name.startswith('.tmp'):
+          continue
+        path = os.path.join(dirpath, name)
+        try:
+          st = os.stat(path)
+        except OSError:
+          continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    if total > self.max_size:
+      entries.sort()
+      for (mtime, size, path) in entries:
+        try:
+          os.unlink(path)
+        except OSError:
+          pass
+        total -= size
+        if total <= self.max_size * TRIM_FRACTION:
+          break
+    self.write_file(os.path.join(self.directory, SIZE_FILE), str(total))
@@ -0,0 +1,272 @@
+""" Abstract machine code in compact form
+Code generation emits each instruction into a CodeBuffer, which keeps
+code as integer columns in arrays: the opcode of each instruction, and
+up to three operands in three more columns, unused ones 0.
+
+Opcodes are the numbers below (MOVE, IADD, ...); labels, comments and
+the .static_data line are pseudo-instructions with opcodes of their own.
+What an operand holds depends on its place (OPERANDS): a register number
+(see temporary() and argument()), or the id of a label or of a string,
+an immediate or comment text, in the StringTable that all the buffers of
+one program share.  Passes over the code (absmc.generate_ssa(), the
+peephole pass) work on the columns; instructions become text only when
+the program is written out (CodeBuffer.write()).
+"""
+from array import array
+from itertools import izip
+
+# opcode -> name, and the kinds of its operands: r register, l label,
+# s string (immediate or comment text)
+INSTRUCTIONS = (
+  ('move', 'rr'), ('move_immed_i', 'rs'), ('move_immed_f', 'rs'),
+  ('iadd', 'rrr'), ('isub', 'rrr'), ('imul', 'rrr'), ('idiv', 'rrr'),
+  ('igt', 'rrr'), ('igeq', 'rrr'), ('ilt', 'rrr'), ('ileq', 'rrr'),
+  ('fadd', 'rrr'), ('fsub', 'rrr'), ('fmul', 'rrr'), ('fdiv', 'rrr'),
+  ('fgt', 'rrr'), ('fgeq', 'rrr'), ('flt', 'rrr'), ('fleq', 'rrr'),
+  ('ftoi', 'rr'), ('itof', 'rr'),
+  ('hload', 'rrr'), ('hstore', 'rrr'), ('halloc', 'rr'),
+  ('jmp', 'l'), ('bz', 'rl'), ('bnz', 'rl'), ('call', 'l'), ('ret', ''),
+  ('save', 'r'), ('restore', 'r'),
+  # pseudo-instructions: "<label>:", a comment line, ".static_data <n>",
+  # and a removed instruction, which is never written out
+  ('label', 'l'), ('comment', 's'), ('.static_data', 's'), ('nop', ''),
+)
+OPCODES = [name for (name, kinds) in INSTRUCTIONS]
+OPERANDS = [kinds for (name, kinds) in INSTRUCTIONS]
+# opcode -> format of its line in a .ami file, with a %s per operand
+FORMATS = [name + ' ' + ', '.join(['%s'] * len(kinds)) + '\n' if kinds
+           else name + '\n' for (name, kinds) in INSTRUCTIONS[:-4]]
+FORMATS += ['%s:\n', '%s\n', '.static_data %s\n', '']
+(MOVE, MOVE_IMMED_I, MOVE_IMMED_F,
+ IADD, ISUB, IMUL, IDIV, IGT, IGEQ, ILT, ILEQ,
+ FADD, FSUB, FMUL, FDIV, FGT, FGEQ, FLT, FLEQ, FTOI, ITOF,
+ HLOAD, HSTORE, HALLOC,
+ JMP, BZ, BNZ, CALL, RET,
+ SAVE, RESTORE,
+ LABEL, COMMENT, STATIC_DATA, NOP) = range(len(INSTRUCTIONS))
+
+# Registers: temporary t<n> is n, argument register a<n> is -2 - n, and
+# sap, the static area pointer, is -1
+SAP = -1
+
+def temporary(n):
+  return n
+
+def argument(n):
+  return -2 - n
+
+A0 = argument(0)
+
+def is_temporary(reg):
+  return reg >= 0
+
+def is_argument(reg):
+  return reg <= -2
+
+def argument_number(reg):
+  return -2 - reg
+
+def register_name(reg):
+  if reg >= 0:
+    return 't' + str(reg)
+  elif reg == SAP:
+    return 'sap'
+  return 'a' + str(-2 - reg)
+
+# strings every StringTable starts out with, each with the same id in all
+# of them, so that code generation can emit their ids without looking
+# them up (see preset())
+PRESET = []
+
+def preset(s):
+  '''Gives s a fixed id, the same in every StringTable made afterwards,
+     and returns it'''
+  if s not in PRESET:
+    PRESET.append(s)
+  return PRESET.index(s)
+
+class StringTable(object):
+  """Distinct strings, each with an integer id"""
+  def __init__(self):
+    self.strings = list(PRESET)
+    self.ids = dict((s, i) for (i, s) in enumerate(self.strings))
+
+  def intern(self, s):
+    '''Returns the id of s, adding it to the table if it is new'''
+    i = self.ids.get(s)
+    if i is None:
+      i = self.ids[s] = len(self.strings)
+      self.strings.append(s)
+    return i
+
+class CodeBuffer(object):
+  """A sequence of instructions, in columns.  Instructions are emitted
+     into a plain list, four items each (opcode, operand, operand,
+     operand), and pack() moves them into the columns, which code
+     generation does
+     once for each method (Context.take_code()).  Anything that reads
+     the columns goes through columns(), which packs first.  Buffers
+     that are combined (extend(), insert()) must share their StringTable.
+     Indexing and iterating give instructions as tuples of text,
+     (opcode, operands...), for looking at."""
+  def __init__(self, table=None):
+    if table is None:
+      table = StringTable()
+    self.table = table
+    self.ops = array('B')
+    self.arg1 = array('i')
+    self.arg2 = array('i')
+    self.arg3 = array('i')
+    # instructions emitted since the last pack(), four items each, which
+    # come after the ones in the columns
+    self.pending = []
+
+  def columns(self):
+    self.pack()
+    return (self.ops, self.arg1, self.arg2, self.arg3)
+
+  def pack(self):
+    '''Moves the pending instructions into the columns'''
+    pending = self.pending
+    if pending:
+      self.ops.fromlist(pending[0::4])
+      self.arg1.fromlist(pending[1::4])
+      self.arg2.fromlist(pending[2::4])
+      self.arg3.fromlist(pending[3::4])
+      self.pending = []
+
+  def emit(self, op, arg1=0, arg2=0, arg3=0):
+    self.pending += (op, arg1, arg2, arg3)
+
+  def emit_each(self, op, operands):
+    '''Emits op once for each of operands, as its only operand'''
+    pending = self.pending
+    for arg in operands:
+      pending += (op, arg, 0, 0)
+
+  def intern(self, s):
+    return self.table.intern(s)
+
+  def label(self, name):
+    self.pending += (LABEL, self.table.intern(name), 0, 0)
+
+  def comment(self, text):
+    self.pending += (COMMENT, self.table.intern(text), 0, 0)
+
+  def extend(self, other):
+    '''Appends the instructions of other'''
+    if not other.ops:
+      self.pending.extend(other.pending)
+      return
+    for (mine, theirs) in izip(self.columns(), other.columns()):
+      mine.extend(theirs)
+
+  def take(self, mark):
+    '''Removes the instructions from index mark to the end, and returns
+       them in a buffer of their own'''
+    taken = CodeBuffer(self.table)
+    packed = len(self.ops)
+    if mark >= packed:
+      taken.pending = self.pending[4 * (mark - packed):]
+      del self.pending[4 * (mark - packed):]
+      return taken
+    for (mine, theirs) in izip(self.columns(), taken.columns()):
+      theirs.extend(mine[mark:])
+      del mine[mark:]
+    return taken
+
+  def insert(self, i, other):
+    '''Puts the instructions of other before instruction i'''
+    packed = len(self.ops)
+    if i >= packed and not other.ops:
+      at = 4 * (i - packed)
+      self.pending[at:at] = other.pending
+      return
+    for (mine, theirs) in izip(self.columns(), other.columns()):
+      mine[i:i] = theirs
+
+  def compact(self, removed=None):
+    '''Removes the NOPs left in place of removed instructions: those at
+       the indexes in removed if given, otherwise all of them'''
+    columns = self.columns()
+    if removed is None:
+      removed = [i for (i, op) in enumerate(self.ops) if op == NOP]
+    # each run of them is deleted from the columns in one go, from the
+    # end so that the indexes still to come stay put
+    runs = []
+    for i in sorted(removed, reverse=True):
+      if runs and runs[-1][0] == i + 1:
+        runs[-1][0] = i
+      else:
+        runs.append([i, i + 1])
+    for (start, end) in runs:
+      for column in columns:
+        del column[start:end]
+
+  def __len__(self):
+    return len(self.ops) + len(self.pending) // 4
+
+  def __getitem__(self, i):
+    if isinstance(i, slice):
+      part = CodeBuffer(self.table)
+      for (mine, theirs) in izip(self.columns(), part.columns()):
+        theirs.extend(mine[i])
+      return part
+    return self.instruction(i)
+
+  def instruction(self, i):
+    '''Instruction i as a tuple of text'''
+    self.pack()
+    op = self.ops[i]
+    strings = self.table.strings
+    if op == LABEL:
+      return (strings[self.arg1[i]] + ':',)
+    elif op == COMMENT:
+      return (strings[self.arg1[i]],)
+    elif op == STATIC_DATA:
+      return ('.static_data ' + strings[self.arg1[i]],)
+    operands = []
+    columns = (self.arg1, self.arg2, self.arg3)
+    for (kind, column) in izip(OPERANDS[op], columns):
+      if kind == 'r':
+        operands.append(register_name(column[i]))
+      else:
+        operands.append(strings[column[i]])
+    return (OPCODES[op],) + tuple(operands)
+
+  def __iter__(self):
+    for i in xrange(len(self)):
+      yield self.instruction(i)
+
+  def write(self, outfile):
+    '''Writes the code out as .ami text, one instruction per line'''
+    self.pack()
+    # operand kind -> table that turns an operand into its text
+    tables = {'r': _RegisterNames(), 'l': self.table.strings,
+              's': self.table.strings}
+    formats = []
+    for (fmt, kinds) in izip(FORMATS, OPERANDS):
+      lookups = [tables[kind] for kind in kinds] + [None] * (3 - len(kinds))
+      formats.append([fmt, len(kinds)] + lookups)
+    lines = []
+    append = lines.append
+    for (op, x, y, z) in izip(self.ops, self.arg1, self.arg2, self.arg3):
+      (fmt, n, first, second, third) = formats[op]
+      if n == 1:
+        append(fmt % first[x])
+      elif n == 2:
+        append(fmt % (first[x], second[y]))
+      elif n == 3:
+        append(fmt % (first[x], second[y], third[z]))
+      else:
+        append(fmt)
+      if len(lines) >= 4096:
+        outfile.writelines(lines)
+        del lines[:]
+    outfile.writelines(lines)
+
+class _RegisterNames(dict):
+  """register number -> name, filled in as registers are looked up"""
+  def __missing__(self, reg):
+    name = self[reg] = register_name(reg)
+    return name
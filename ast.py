@@ -1,17 +1,14 @@
+import math
 import absmc
+from amicode import (MOVE, MOVE_IMMED_I, MOVE_IMMED_F, IADD, ISUB, IMUL,
+                     IDIV, IGT, IGEQ, ILT, ILEQ, HLOAD, HSTORE, HALLOC, JMP,
+                     RET, SAVE, RESTORE, COMMENT, STATIC_DATA, A0, SAP)
+import amicode
 from collections import OrderedDict
 
-classtable = OrderedDict()  # initially empty dictionary of classes.
-lastmethod = 0
-lastconstructor = 0
-
-current_class = None
-is_constructor = False
-current_method = None
-curr_method_return = False
-
 class CodeGenerationError(Exception):
-  def __init__(self, msg):
+  def __init__(self, lines, msg):
+    self.lines = lines
     self.msg = msg
 
 # Class table.  Only user-defined classes are placed in the class table.
@@ -24,69 +21,214 @@ def lookup(table, key):
 def addtotable(table, key, value):
   table[key] = value
 
-
-def print_ast():
-  for cid in classtable:
-    c = classtable[cid]
+# Code generation emits instructions into ctx.code, an amicode.CodeBuffer
+# holding the code of the method being generated.  Code that must be
+# generated before it is placed (e.g. a post-increment, which comes after
+# the assignment or call it is part of) is generated there, then taken
+# off the end (CodeBuffer.take()) and put back in its place.
+
+# string ids of the comments that never change, the same in every
+# program's StringTable
+IF_COMMENT = amicode.preset("#if statement")
+WHILE_COMMENT = amicode.preset("#while loop")
+FOR_COMMENT = amicode.preset("#for loop")
+RETURN_COMMENT = amicode.preset("#return")
+START_BLOCK_COMMENT = amicode.preset('# Start block')
+END_BLOCK_COMMENT = amicode.preset('# End block')
+BREAK_COMMENT = amicode.preset("#break")
+CONTINUE_COMMENT = amicode.preset("#continue")
+ASSIGN_COMMENT = amicode.preset("#assign expr")
+AUTO_COMMENT = amicode.preset("#auto expression")
+THIS_COMMENT = amicode.preset("#this expr")
+SUPER_COMMENT = amicode.preset('# super expr')
+
+def check_arg(ctx, call, i):
+  '''Checks argument i of a method call or new, only the first time it is
+     needed: every candidate method or constructor reuses the result'''
+  valid = call.args_valid[i]
+  if valid is None:
+    valid = call.args_valid[i] = call.args[i].check(ctx)
+  return valid
+
+# Constant folding.  Once a class has been checked, fold() goes down its
+# methods and constructors, and each expression's fold() returns the
+# expression to generate code for in its place: operations on constants
+# are computed, and operations that leave one operand unchanged (x+0,
+# x*1, !!b, true && b, ...) are replaced by that operand.
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+def constant_value(expr):
+  '''The value of expr if it is an int, float or boolean constant, else
+     None'''
+  if isinstance(expr, ConstantExpr):
+    if expr.kind == 'int' or expr.kind == 'float':
+      return expr.data
+    elif expr.kind == 'True':
+      return True
+    elif expr.kind == 'False':
+      return False
+  return None
+
+def make_constant(ctx, value, lines):
+  '''A checked ConstantExpr holding value, or None if there is no value
+     or it cannot be a constant: an int outside 32 bits, which the
+     program computes (and wraps) at run time instead, or a float that is
+     not finite'''
+  if value is None:
+    return None
+  if isinstance(value, bool):
+    const = ConstantExpr(str(value), lines=lines)
+  elif isinstance(value, float):
+    if math.isinf(value) or math.isnan(value):
+      return None
+    const = ConstantExpr('float', value, lines)
+  else:
+    if value < INT_MIN or value > INT_MAX:
+      return None
+    const = ConstantExpr('int', int(value), lines)
+  const.check(ctx)
+  return const
+
+def fold_binary(bop, x, y):
+  '''Value of x bop y for constants x and y, as Decaf computes it, or
+     None if it is not computed here (division by zero)'''
+  if bop == 'add':
+    return x + y
+  elif bop == 'sub':
+    return x - y
+  elif bop == 'mul':
+    return x * y
+  elif bop == 'div':
+    if y == 0:
+      return None
+    if isinstance(x, float) or isinstance(y, float):
+      return float(x) / y
+    # integer division truncates towards zero
+    q = abs(x) // abs(y)
+    if (x < 0) != (y < 0):
+      q = -q
+    return q
+  elif bop == 'and':
+    return x and y
+  elif bop == 'or':
+    return x or y
+  elif bop == 'eq':
+    return x == y
+  elif bop == 'neq':
+    return x != y
+  elif bop == 'lt':
+    return x < y
+  elif bop == 'leq':
+    return x <= y
+  elif bop == 'gt':
+    return x > y
+  elif bop == 'geq':
+    return x >= y
+  return None
+
+def is_pure(expr):
+  '''Whether leaving expr out changes nothing but its value: it has no
+     side effects and cannot fail'''
+  if isinstance(expr, (ConstantExpr, VarExpr, ThisExpr)):
+    return True
+  elif isinstance(expr, UnaryExpr):
+    return is_pure(expr.arg)
+  elif isinstance(expr, BinaryExpr):
+    return expr.bop != 'div' and is_pure(expr.arg1) and is_pure(expr.arg2)
+  return False
+
+def operand(expr, result):
+  '''expr, an operand of result, to stand for result, or result if it
+     cannot: an increment only works in the places it was written in'''
+  if isinstance(expr, AutoExpr):
+    return result
+  return expr
+
+
+def print_ast(ctx):
+  for cid in ctx.classtable:
+    c = ctx.classtable[cid]
     c.printout()
   print "-----------------------------------------------------------------------------"
 
 
-def initialize_ast():
+def initialize_ast(ctx):
   # define In class:
   cin = Class("In", None)
   cin.builtin = True     # this is a builtin class
   cout = Class("Out", None)
   cout.builtin = True     # this, too, is a builtin class
 
-  scanint = Method('scan_int', cin, 'public', 'static', Type('int'))
+  scanint = Method('scan_int', cin, 'public', 'static', ctx.types.get('int'), ctx.new_method_id())
   scanint.update_body(SkipStmt(None))    # No line number information for the empty body
   cin.add_method(scanint)
 
-  scanfloat = Method('scan_float', cin, 'public', 'static', Type('float'))
+  scanfloat = Method('scan_float', cin, 'public', 'static', ctx.types.get('float'), ctx.new_method_id())
   scanfloat.update_body(SkipStmt(None))    # No line number information for the empty body
   cin.add_method(scanfloat)
 
-  printint = Method('print', cout, 'public', 'static', Type('void'))
+  printint = Method('print', cout, 'public', 'static', ctx.types.get('void'), ctx.new_method_id())
   printint.update_body(SkipStmt(None))    # No line number information for the empty body
-  printint.add_var('i', 'formal', Type('int'))   # single integer formal parameter
+  printint.add_var('i', 'formal', ctx.types.get('int'))   # single integer formal parameter
   cout.add_method(printint)
   
-  printfloat = Method('print', cout, 'public', 'static', Type('void'))
+  printfloat = Method('print', cout, 'public', 'static', ctx.types.get('void'), ctx.new_method_id())
   printfloat.update_body(SkipStmt(None))    # No line number information for the empty body
-  printfloat.add_var('f', 'formal', Type('float'))   # single float formal parameter
+  printfloat.add_var('f', 'formal', ctx.types.get('float'))   # single float formal parameter
   cout.add_method(printfloat)
   
-  printboolean = Method('print', cout, 'public', 'static', Type('void'))
+  printboolean = Method('print', cout, 'public', 'static', ctx.types.get('void'), ctx.new_method_id())
   printboolean.update_body(SkipStmt(None))    # No line number information for the empty body
-  printboolean.add_var('b', 'formal', Type('boolean'))   # single boolean formal parameter
+  printboolean.add_var('b', 'formal', ctx.types.get('boolean'))   # single boolean formal parameter
   cout.add_method(printboolean)
   
-  printstring = Method('print', cout, 'public', 'static', Type('void'))
+  printstring = Method('print', cout, 'public', 'static', ctx.types.get('void'), ctx.new_method_id())
   printstring.update_body(SkipStmt(None))    # No line number information for the empty body
-  printstring.add_var('b', 'formal', Type('string'))   # single string formal parameter
+  printstring.add_var('b', 'formal', ctx.types.get('string'))   # single string formal parameter
   cout.add_method(printstring)
 
-  addtotable(classtable, "In", cin)
-  addtotable(classtable, "Out", cout)
-
-def generate_code():
-  code = []
-  for cls in classtable.values():
-    code += cls.generate_code()
-
-  code = [('.static_data ' + str(absmc.static_size),)] + code
-  return code
+  addtotable(ctx.classtable, "In", cin)
+  addtotable(ctx.classtable, "Out", cout)
+
+def generate_code(ctx):
+  '''Generates the program a method at a time, yielding the code of
+     each method (an amicode.CodeBuffer) so the caller can write it out
+     as it comes.  Fields were laid out as each class was completed
+     (Class.complete()).'''
+  ctx.code.emit(STATIC_DATA, ctx.code.intern(str(ctx.machine.static_size)))
+  for cls in ctx.classtable.values():
+    for code in cls.generate_code(ctx):
+      yield code
+  if len(ctx.code) > 0:
+    yield ctx.take_code()
 
 class Class(object):
   """A class encoding Classes in Decaf"""
   def __init__(self, classname, superclass):
     self.name = classname
     self.superclass = superclass
-    self.fields = {}  # dictionary, keyed by field name
+    # names of this class and all its superclasses: a class is declared
+    # after its superclass, so the superclass's set is already complete
+    if superclass is None:
+      self.ancestors = frozenset([classname])
+    else:
+      self.ancestors = superclass.ancestors | frozenset([classname])
+    # keyed by field name, in the order declared, which is the order
+    # complete() lays them out in
+    self.fields = OrderedDict()
     self.constructors = []
     self.methods = []
     self.builtin = False
+    # (name, storage, number of parameters) -> methods, and number of
+    # parameters -> constructors; made when first needed, which is when
+    # the class is checked and all its methods have been declared
+    self.method_index = None
+    self.constructor_index = None
+    # fields by name, inherited ones included, and the number of instance
+    # fields, inherited ones included; set by complete()
+    self.all_fields = {}
+    self.heap_size = 0
 
   def printout(self):
     if (self.builtin):
@@ -115,64 +257,100 @@ class Class(object):
     self.fields[fname] = field
   def add_constructor(self, constr):
     self.constructors.append(constr)
+    self.constructor_index = None
   def add_method(self, method):
     self.methods.append(method)
+    self.method_index = None
+
+  def find_methods(self, mname, storage, nparams):
+    '''Methods declared in this class (not its superclasses) with this
+       name, storage and number of parameters, in the order declared'''
+    if self.method_index is None:
+      self.method_index = {}
+      for method in self.methods:
+        key = (method.name, method.storage, len(method.vars.get_params()))
+        self.method_index.setdefault(key, []).append(method)
+    return self.method_index.get((mname, storage, nparams), [])
+
+  def find_constructors(self, nparams):
+    '''Constructors with this number of parameters, in the order declared'''
+    if self.constructor_index is None:
+      self.constructor_index = {}
+      for constructor in self.constructors:
+        key = len(constructor.vars.get_params())
+        self.constructor_index.setdefault(key, []).append(constructor)
+    return self.constructor_index.get(nparams, [])
 
   def lookup_field(self, fname):
     return lookup(self.fields, fname)
 
-  # check if this class is a subtype of class_name by going up the hierarchy
+  # check if this class is a subtype of class_name, in one lookup
   def isSubClass(self, super_class):
-    suclass = self
-    while (suclass != None):
-      if (suclass.name == super_class):
-        return True
-      suclass = suclass.superclass
-    return False
+    return super_class in self.ancestors
 
-  # Only runs after typechecking is successful
-  def generate_code(self):
-    global current_class
-    code = [(" ".join(["#CLASS (", self.name, ")"]),)]
-    current_class = self
+  # Once the class body is parsed, assigns offsets to its fields, after
+  # those of its superclasses, and makes the table of all the fields an
+  # access can find; a field hides any of the same name further up
+  def complete(self, ctx):
     if self.superclass is not None:
       self.heap_size = self.superclass.heap_size
+      self.all_fields = dict(self.superclass.all_fields)
     else:
       self.heap_size = 0
-    #generate code for fields
-    #print "CLASS (",self.name,")"
-    for field in self.fields.values():
-      code += field.generate_code()
+      self.all_fields = {}
+    for field in self.fields.itervalues():
+      field.layout(ctx)
+    self.all_fields.update(self.fields)
+
+  # Only runs after typechecking is successful; yields the code of each
+  # constructor and method
+  def generate_code(self, ctx):
+    ctx.code.comment(" ".join(["#CLASS (", self.name, ")"]))
+    ctx.current_class = self
 
     #generate code for constructors
     for constructor in self.constructors:
-      code += constructor.generate_code()
+      constructor.generate_code(ctx)
+      yield ctx.take_code()
     #generate code for methods
     for method in self.methods:
-      code += method.generate_code()
-
-    return code
+      method.generate_code(ctx)
+      yield ctx.take_code()
+    #a class without either still has its comment
+    if len(ctx.code) > 0:
+      yield ctx.take_code()
 
 
-  def check(self):
+  def check(self, ctx):
     '''Type checking and name resolution starts here,
         by going down the nodes in a class.'''
-    global current_class
-    current_class = self
+    ctx.current_class = self
     success = True
     for constructor in self.constructors:
-      if constructor.check() == False:
+      if constructor.check(ctx) == False:
         success = False
     for method in self.methods:
-      if method.check() == False:
+      if method.check(ctx) == False:
         success = False
     return success
+
+  # Only runs after typechecking is successful
+  def fold(self, ctx):
+    '''Folds the constants in every constructor and method body'''
+    for constructor in self.constructors:
+      constructor.body.fold(ctx)
+    for method in self.methods:
+      method.body.fold(ctx)
       
+BASIC_TYPES = ('int', 'boolean', 'float', 'string', 'void', 'error', 'null')
+
 class Type(object):
-  """A class encoding Types in Decaf"""
+  """A class encoding Types in Decaf.  Types are never changed once made,
+     so the checker shares one instance of each, from ctx.types."""
+  __slots__ = ('kind', 'typename', 'basetype')
   def __init__(self, basetype, class_ref=None, params=None):
     if ((params == None) or (params == 0)):
-      if (basetype in ['int', 'boolean', 'float', 'string', 'void', 'error', 'null']):
+      if (basetype in BASIC_TYPES):
         self.kind = 'basic'
         self.typename = basetype
       elif (isinstance(basetype, Type)):
@@ -202,13 +380,16 @@ class Type(object):
     return self.__str__()
 
   #self is a subclass of type2. whereever type 2 can go, self can go
-  def compatible(self, type2):
+  def compatible(self, type2, ctx):
+    known = ctx.types.compatibility.get((self, type2))
+    if known is not None:
+      return known
     equal = self.typename == type2.typename
     is_subclass = False
     if self.typename == 'int' and type2.typename == 'float':
       is_subclass = True
     elif (self.kind == 'class' or self.kind == 'class-literal') and not equal:
-      cls = lookup(classtable, self.typename)
+      cls = lookup(ctx.classtable, self.typename)
       if cls is not None:
         is_subclass = cls.isSubClass(type2.typename)
       else:
@@ -216,40 +397,74 @@ class Type(object):
         return False
     elif self.typename == 'null' and type2.kind == 'class':
       is_subclass = True
+    # a class's superclasses are all declared before it, so the answer
+    # stays the same for the rest of the compile
+    ctx.types.compatibility[(self, type2)] = equal or is_subclass
     return equal or is_subclass
 
+class TypeTable(object):
+  """The Types of one compile: get() returns the same instance for the
+     same type, so checking makes no new Types, and compatible() results
+     can be kept per pair of instances (in compatibility)"""
+  def __init__(self):
+    # (kind, typename) or ('array', element Type) -> Type
+    self.types = {}
+    # (Type, Type) -> result of Type.compatible
+    self.compatibility = {}
+
+  def get(self, basetype, class_ref=None, params=None):
+    '''The Type that Type(basetype, class_ref, params) describes'''
+    if params:
+      # as in Type(), the element type gets params-1 as its class_ref
+      key = ('array', self.get(basetype, params-1))
+    elif isinstance(basetype, Type):
+      key = (basetype.kind, basetype.typename)
+    elif basetype in BASIC_TYPES:
+      key = ('basic', basetype)
+    elif class_ref:
+      key = ('class-literal', basetype)
+    else:
+      key = ('class', basetype)
+    t = self.types.get(key)
+    if t is None:
+      t = Type.__new__(Type)
+      t.kind = key[0]
+      if t.kind == 'array':
+        t.basetype = key[1]
+      else:
+        t.typename = key[1]
+      self.types[key] = t
+    return t
+
 class Field(object):
   """A class encoding fields and their attributes in Decaf"""
-  lastfield = 0
-  def __init__(self, fname, fclass, visibility, storage, ftype):
-    Field.lastfield += 1
+  __slots__ = ('name', 'id', 'inclass', 'visibility', 'storage', 'type', 'offset')
+  def __init__(self, fname, fclass, visibility, storage, ftype, id):
     self.name = fname
-    self.id = Field.lastfield
+    self.id = id
     self.inclass = fclass
     self.visibility = visibility
     self.storage = storage
     self.type = ftype
+    self.offset = None
 
   def printout(self):
     print "FIELD {0}, {1}, {2}, {3}, {4}, {5}".format(self.id, self.name, self.inclass.name, self.visibility, self.storage, self.type)
     print "offset("+str(self.offset)+")"
 
-  def generate_code(self):
+  def layout(self, ctx):
     if self.storage == 'static':
-      self.offset = absmc.allocate_static_space()
+      if self.offset is None:
+        self.offset = ctx.machine.allocate_static_space()
     else:
       self.offset = self.inclass.heap_size
       self.inclass.heap_size += 1
-    #print self.name, self.storage, self.offset
-    return []
 
 class Method(object):
   """A class encoding methods and their attributes in Decaf"""
-  def __init__(self, mname, mclass, visibility, storage, rtype):
-    global lastmethod
+  def __init__(self, mname, mclass, visibility, storage, rtype, id):
     self.name = mname
-    lastmethod += 1
-    self.id = lastmethod
+    self.id = id
     self.inclass = mclass
     self.visibility = visibility
     self.storage = storage
@@ -268,44 +483,41 @@ class Method(object):
     else:
       return '_'.join(['M', self.name, str(self.id)])
 
-  def generate_code(self):
-    global current_method, is_constructor, curr_method_return
-    current_method = self
-    is_constructor = False
-    curr_method_return = False
+  def generate_code(self, ctx):
+    ctx.current_method = self
+    ctx.is_constructor = False
+    ctx.curr_method_return = False
     #generate label
     method_label = self.get_label()
     #set up registers for variables
-    absmc.reset_argument_register(self.storage)
+    ctx.machine.reset_argument_register(self.storage)
     #print "REGISTERS (",self.name,")"
     #code = [(method_label + ':',)]
-    code = absmc.set_current_label(method_label, False)
-    absmc.start_registers_scope()
+    code = ctx.code
+    ctx.machine.set_current_label(code, method_label, False)
+    ctx.machine.start_registers_scope()
 
     for b in range(self.vars.lastblock+1):
       for vname in self.vars.vars[b]:
-        code += self.vars.vars[b][vname].generate_code()
+        self.vars.vars[b][vname].generate_code(ctx)
         #print vname, self.vars.vars[b][vname].register
 
     #generate code for the body
-    code += self.body.generate_code()
+    self.body.generate_code(ctx)
 
     #get rid of register cache
-    absmc.kill_registers_scope()
+    ctx.machine.kill_registers_scope()
 
     # add to processed methods list
-    absmc.finished_processing(method_label)
-
-    return code
-
-  def check(self):
-    global current_method, is_constructor, curr_method_return
-    current_method = self
-    is_constructor = False
-    curr_method_return = False
-    if self.body.check():
-      if self.rtype.typename != 'void' and not curr_method_return:
-        print "{0}: Method '{1}' must return a value of type {2}".format(self.body.lines, self.name, self.rtype.typename)
+    ctx.machine.finished_processing(method_label)
+
+  def check(self, ctx):
+    ctx.current_method = self
+    ctx.is_constructor = False
+    ctx.curr_method_return = False
+    if self.body.check(ctx):
+      if self.rtype.typename != 'void' and not ctx.curr_method_return:
+        ctx.error(self.body.lines, "Method '{0}' must return a value of type {1}".format(self.name, self.rtype.typename))
         return False
       return True
     return False
@@ -321,11 +533,9 @@ class Method(object):
     
 class Constructor(object):
   """A class encoding constructors and their attributes in Decaf"""
-  def __init__(self, cname, visibility):
-    global lastconstructor
+  def __init__(self, cname, visibility, id):
     self.name = cname
-    lastconstructor += 1
-    self.id = lastconstructor
+    self.id = id
     self.visibility = visibility
     self.vars = VarTable()
     
@@ -338,36 +548,34 @@ class Constructor(object):
   def get_label(self):
     return '_'.join(['C', str(self.id)])
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #set up registers for variables
-    global current_method, is_constructor
-    current_method = self
-    is_constructor = True
-    absmc.reset_argument_register("instance")
+    ctx.current_method = self
+    ctx.is_constructor = True
+    ctx.machine.reset_argument_register("instance")
     constructor_label = self.get_label()
     #print "REGISTERS (",self.name,")"
-    absmc.start_registers_scope()
+    ctx.machine.start_registers_scope()
     #generate code for body
     #code = [(constructor_label + ':',)]
-    code = absmc.set_current_label(constructor_label, False)
+    code = ctx.code
+    ctx.machine.set_current_label(code, constructor_label, False)
     for b in range(self.vars.lastblock+1):
       for vname in self.vars.vars[b]:
-        code += self.vars.vars[b][vname].generate_code()
+        self.vars.vars[b][vname].generate_code(ctx)
         #print vname, self.vars.vars[b][vname].register
 
     
-    code += self.body.generate_code()
-    code.append(("ret",))
-    absmc.kill_registers_scope()
+    self.body.generate_code(ctx)
+    code.emit(RET)
+    ctx.machine.kill_registers_scope()
 
-    absmc.processed_method_labels.append(constructor_label)
-    return code
+    ctx.machine.processed_method_labels.append(constructor_label)
 
-  def check(self):
-    global current_method, is_constructor
-    current_method = self
-    is_constructor = True
-    return self.body.check()
+  def check(self, ctx):
+    ctx.current_method = self
+    ctx.is_constructor = True
+    return self.body.check(ctx)
 
   def printout(self):
     print "CONSTRUCTOR: {0}, {1}".format(self.id, self.visibility)
@@ -380,53 +588,64 @@ class Constructor(object):
     
 
 class VarTable(object):
-  """ Table of variables in each method/constructor"""
+  """ Table of variables in each method/constructor.  vars keeps every
+      block's variables, for code generation; visible maps each name to
+      the variables of that name in the blocks still open, innermost last,
+      so entering and leaving a block and finding a name take constant
+      time."""
   def __init__(self):
     self.vars = OrderedDict()
     self.vars[0] = OrderedDict()
     self.lastvar = 0
     self.lastblock = 0
-    self.levels = [0]
+    self.levels = [0]   # open blocks, innermost last
+    self.visible = {}
+    # formal parameters, kept once get_params() has found them
+    self.params = None
 
   def enter_block(self):
     self.lastblock += 1
-    self.levels.insert(0, self.lastblock)
+    self.levels.append(self.lastblock)
     self.vars[self.lastblock] = {}
 
   def leave_block(self):
-    self.levels = self.levels[1:]
     # where should we check if we can indeed leave the block?
+    if not self.levels:
+      return
+    for vname in self.vars[self.levels.pop()]:
+      shadowed = self.visible[vname]
+      shadowed.pop()
+      if not shadowed:
+        del self.visible[vname]
 
   def add_var(self, vname, vkind, vtype):
     self.lastvar += 1
-    c = self.levels[0]   # current block number
+    c = self.levels[-1]   # current block number
     v = Variable(vname, self.lastvar, vkind, vtype)
     vbl = self.vars[c]  # list of variables in current block
+    if vname in vbl:
+      # replaces the one declared before in this block
+      self.visible[vname][-1] = v
+    else:
+      self.visible.setdefault(vname, []).append(v)
     vbl[vname] = v
+    if c == 0:
+      self.params = None
   
-  def _find_in_block(self, vname, b):
-    if (b in self.vars):
-      # block exists
-      if (vname in self.vars[b]):
-        return self.vars[b][vname]
-    # Otherwise, either block b does not exist, or vname is not in block b
-    return None
-
   def find_in_current_block(self, vname):
-    return self._find_in_block(vname, self.levels[0])
+    return self.vars[self.levels[-1]].get(vname)
 
   def find_in_scope(self, vname):
-    for b in self.levels:
-      v = self._find_in_block(vname, b)
-      if v is not None:
-        return v
-      # otherwise, locate in enclosing block until we run out
+    shadowed = self.visible.get(vname)
+    if shadowed:
+      return shadowed[-1]
     return None
 
   def get_params(self):
-    outermost = self.vars[0]  # 0 is the outermost block
-    ids = [outermost[vname] for vname in outermost if outermost[vname].kind=='formal']
-    return ids
+    if self.params is None:
+      outermost = self.vars[0]  # 0 is the outermost block
+      self.params = [outermost[vname] for vname in outermost if outermost[vname].kind=='formal']
+    return self.params
 
   def printout(self):
     print "Variable Table:"
@@ -438,6 +657,7 @@ class VarTable(object):
 
 class Variable(object):
   """ Record for a single variable"""
+  __slots__ = ('name', 'id', 'kind', 'type', 'register')
   def __init__(self, vname, id, vkind, vtype):
     self.name = vname
     self.id = id
@@ -447,79 +667,85 @@ class Variable(object):
   def printout(self):
     print "VARIABLE {0}, {1}, {2}, {3}".format(self.id, self.name, self.kind, self.type)
   
-  def generate_code(self):
+  def generate_code(self, ctx):
     if self.kind == 'formal':
-      self.register = absmc.generate_argument_register()
-      return []
+      self.register = ctx.machine.generate_argument_register()
     else:
-      self.register = absmc.generate_temporary_register()
+      self.register = ctx.machine.generate_temporary_register()
       #declare the variable -> define it to be 0
-      return [("move_immed_i", self.register, '0')]
+      ctx.code.emit(MOVE_IMMED_I, self.register, ctx.code.intern('0'))
 
 class Stmt(object): 
   """ Top-level (abstract) class representing all statements"""
+  __slots__ = ('lines',)
+
+  def fold(self, ctx):
+    '''Folds the constants in the statement's expressions'''
+    pass
 
 class IfStmt(Stmt):
+  __slots__ = ('condition', 'thenpart', 'elsepart')
   def __init__(self, condition, thenpart, elsepart, lines):
     self.lines = lines
     self.condition = condition
     self.thenpart = thenpart
     self.elsepart = elsepart
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     '''
-      <condition stmt>
-      bz $t0, else
+      <condition stmt, jumping to else if false>
       <then stuff>
       jmp exit_if:
       else:
       <else stuff>
       exit_if:
     '''
-    then_label = absmc.get_new_label()
-    else_label = absmc.get_new_label()
-    exit_label = absmc.get_new_label()
-    code = [("#if statement",)]
+    then_label = ctx.machine.get_new_label()
+    else_label = ctx.machine.get_new_label()
+    exit_label = ctx.machine.get_new_label()
+    code = ctx.code
+    code.emit(COMMENT, IF_COMMENT)
 
     #generate code for each part of if statement
-    #generate condition
-    code += self.condition.generate_code()
-    #evaluate condition
-    #code.append(('bz', self.condition.register, else_label))
-    code += absmc.branch(self.condition.register, else_label, True)
+    #evaluate condition, going to else if it is false
+    self.condition.generate_cond(ctx, else_label, False, then_label)
 
     #then scope
-    code += absmc.set_current_label(then_label, True)
-    absmc.start_registers_scope()
+    ctx.machine.set_current_label(code, then_label, True)
+    ctx.machine.start_registers_scope()
     #condition = true, do this stuff
-    code += self.thenpart.generate_code()
+    self.thenpart.generate_code(ctx)
     #skip over the else
-    code += absmc.jump(exit_label)
+    ctx.machine.jump(code, exit_label)
     #end of scope
-    absmc.kill_registers_scope()
+    ctx.machine.kill_registers_scope()
 
     #else scope
-    absmc.start_registers_scope()
+    ctx.machine.start_registers_scope()
     #start the else part
-    code += absmc.set_current_label(else_label, False)
+    ctx.machine.set_current_label(code, else_label, False)
     #else code
-    code += self.elsepart.generate_code()
+    self.elsepart.generate_code(ctx)
     #end of scope
-    absmc.kill_registers_scope()
+    ctx.machine.kill_registers_scope()
 
     #exit if statement
-    code += absmc.set_current_label(exit_label, True)
+    ctx.machine.set_current_label(code, exit_label, True)
 
     #print "\n".join(code)
-    return code
 
-  def check(self):
-    cond_check = self.condition.check()
-    then_check = self.thenpart.check()
-    else_check = self.elsepart.check()
+  def fold(self, ctx):
+    self.condition = self.condition.fold(ctx)
+    self.thenpart.fold(ctx)
+    self.elsepart.fold(ctx)
+
+  def check(self, ctx):
+    cond_check = self.condition.check(ctx)
+    then_check = self.thenpart.check(ctx)
+    else_check = self.elsepart.check(ctx)
     if cond_check:
-      if not self.condition.type.compatible(Type('boolean')):
-        print "{0}: Invalid condition type {1}.".format(self.lines, self.condition.type.typename)
+      if not self.condition.type.compatible(ctx.types.get('boolean'), ctx):
+        ctx.error(self.lines, "Invalid condition type {0}.".format(self.condition.type.typename))
         return False
       return then_check and else_check
     return False
@@ -534,60 +760,62 @@ class IfStmt(Stmt):
     print ")"
 
 class WhileStmt(Stmt):
+  __slots__ = ('cond', 'body')
   def __init__(self, cond, body, lines):
     self.lines = lines
     self.cond = cond
     self.body = body
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #gen : label here
     '''
     check_cond:
-    bz t0, end_while
+    <condition, jumping to end_while if false>
     # do loop things
     jmp check_cond
     end_while:
     # rest of program
     '''
     #generate code for loop condition
-    #curr_label = absmc.get_current_label()
-    check_cond = absmc.get_new_label()
-    body_label = absmc.get_new_label()
-    end_while = absmc.get_new_label()
-    absmc.continue_labels.append(check_cond)
-    absmc.break_labels.append(end_while)
+    #curr_label = ctx.machine.get_current_label()
+    check_cond = ctx.machine.get_new_label()
+    body_label = ctx.machine.get_new_label()
+    end_while = ctx.machine.get_new_label()
+    ctx.machine.continue_labels.append(check_cond)
+    ctx.machine.break_labels.append(end_while)
     
-    code = [("#while loop",)]
-    absmc.start_registers_scope()
+    code = ctx.code
+    code.emit(COMMENT, WHILE_COMMENT)
+    ctx.machine.start_registers_scope()
     # Check if condition is still true
-    code += absmc.set_current_label(check_cond, True)
-    code += self.cond.generate_code()
-    #code.append(('bz', self.cond.register, end_while))
-    code += absmc.branch(self.cond.register, end_while, True)
+    ctx.machine.set_current_label(code, check_cond, True)
+    self.cond.generate_cond(ctx, end_while, False, body_label)
 
     #loop body
-    code += absmc.set_current_label(body_label, True)
+    ctx.machine.set_current_label(code, body_label, True)
     # Get code for body
-    code += self.body.generate_code()
+    self.body.generate_code(ctx)
     # jump back to condition check
-    code += absmc.jump(check_cond)
+    ctx.machine.jump(code, check_cond)
 
     # label after the loop for failed conditions
     #code.append((end_while + ':',))
-    code += absmc.set_current_label(end_while, False)
+    ctx.machine.set_current_label(code, end_while, False)
 
-    absmc.continue_labels.pop()
-    absmc.break_labels.pop()
-    absmc.kill_registers_scope()
+    ctx.machine.continue_labels.pop()
+    ctx.machine.break_labels.pop()
+    ctx.machine.kill_registers_scope()
 
-    return code
+  def fold(self, ctx):
+    self.cond = self.cond.fold(ctx)
+    self.body.fold(ctx)
 
-  def check(self):
-    cond_check = self.cond.check()
-    body_check = self.body.check()
+  def check(self, ctx):
+    cond_check = self.cond.check(ctx)
+    body_check = self.body.check(ctx)
     if cond_check:
-      if not self.cond.type.compatible(Type('boolean')):
-        print "{0}: Invalid condition type {1}.".format(self.lines, self.cond.type.typename)
+      if not self.cond.type.compatible(ctx.types.get('boolean'), ctx):
+        ctx.error(self.lines, "Invalid condition type {0}.".format(self.cond.type.typename))
         return False
       return body_check
     return False
@@ -600,6 +828,7 @@ class WhileStmt(Stmt):
     print ")"
 
 class ForStmt(Stmt):
+  __slots__ = ('init', 'cond', 'update', 'body')
   def __init__(self, init, cond, update, body, lines):
     self.lines = lines
     self.init = init
@@ -607,70 +836,90 @@ class ForStmt(Stmt):
     self.update = update
     self.body = body
 
-  def generate_code(self):
-    code = [("#for loop",)]
-    absmc.start_registers_scope()
+  def generate_code(self, ctx):
+    code = ctx.code
+    code.emit(COMMENT, FOR_COMMENT)
+    ctx.machine.start_registers_scope()
 
     #initialize all vars first
     if self.init is not None:
-      code += self.init.generate_code()
+      self.init.generate_code(ctx)
     #gen : label
-    for_start = absmc.get_new_label()
-    for_update = absmc.get_new_label()
-    for_end = absmc.get_new_label()
-    absmc.continue_labels.append(for_update)
-    absmc.break_labels.append(for_end)
+    for_start = ctx.machine.get_new_label()
+    for_update = ctx.machine.get_new_label()
+    for_end = ctx.machine.get_new_label()
+    ctx.machine.continue_labels.append(for_update)
+    ctx.machine.break_labels.append(for_end)
     
     #start the for loop
-    code += absmc.set_current_label(for_start, True)
+    ctx.machine.set_current_label(code, for_start, True)
+
+    #generate code for loop body
+    if self.body is not None:
+      for_body = ctx.machine.get_new_label()
+    else:
+      for_body = for_update
 
     #check condition here
     if self.cond is not None:
-      code += self.cond.generate_code()
-      #branch if condition = 0
-      #code.append(('bz', self.cond.register, for_end))
-      code += absmc.branch(self.cond.register, for_end, True)
-    
-    #generate code for loop body
+      #branch to the end if condition is false
+      self.cond.generate_cond(ctx, for_end, False, for_body)
+
     if self.body is not None:
-      for_body = absmc.get_new_label()
-      code += absmc.set_current_label(for_body, True)
-      code += self.body.generate_code()
+      ctx.machine.set_current_label(code, for_body, True)
+      self.body.generate_code(ctx)
 
     #update gets done at the end, right before jumping back to top of loop
-    code += absmc.set_current_label(for_update, True)
+    ctx.machine.set_current_label(code, for_update, True)
     if self.update is not None:
-      code += self.update.generate_code()
+      self.update.generate_code(ctx)
 
     #gen : jump to for start label 
-    code += absmc.jump(for_start)
+    ctx.machine.jump(code, for_start)
 
     #label to signify end of for
-    code += absmc.set_current_label(for_end, False)
-
-    absmc.continue_labels.pop()
-    absmc.break_labels.pop()
-    absmc.kill_registers_scope()
+    ctx.machine.set_current_label(code, for_end, False)
 
-    return code
+    ctx.machine.continue_labels.pop()
+    ctx.machine.break_labels.pop()
+    ctx.machine.kill_registers_scope()
 
-  def check(self):
+  def fold(self, ctx):
+    self.init = self.fold_part(ctx, self.init)
+    if self.cond is not None:
+      self.cond = self.cond.fold(ctx)
+    self.update = self.fold_part(ctx, self.update)
+    if self.body is not None:
+      self.body.fold(ctx)
+
+  def fold_part(self, ctx, part):
+    '''Folds the init or update part, an expression or a SkipStmt where it
+       was left out.  Returns None, leaving the part out of the code, if
+       there is nothing to evaluate.'''
+    if part is None or isinstance(part, SkipStmt):
+      return None
+    part = part.fold(ctx)
+    if is_pure(part):
+      return None
+    return part
+
+  def check(self, ctx):
     init_check = True
     update_check = True
     body_check = False
     cond_check = True
     if self.init is not None:
-      init_check = self.init.check()
+      init_check = self.init.check(ctx)
     if self.body is not None:
-      body_check = self.body.check()
+      body_check = self.body.check(ctx)
     if self.update is not None:
-      update_check = self.update.check()
+      update_check = self.update.check(ctx)
     if self.cond is not None:
-      cond_check = self.cond.check()
+      cond_check = self.cond.check(ctx)
 
     if cond_check and self.cond is not None:
-      if not self.cond.type.compatible(Type('boolean')):
-        print "{0}: Invalid condition type {1}.".format(self.lines, self.cond.type.typename)
+      if not self.cond.type.compatible(ctx.types.get('boolean'), ctx):
+        ctx.error(self.lines, "Invalid condition type {0}.".format(self.cond.type.typename))
         return False
     return init_check and body_check and update_check and cond_check
 
@@ -690,41 +939,44 @@ class ForStmt(Stmt):
     print ")"
 
 class ReturnStmt(Stmt):
+  __slots__ = ('expr', 'register')
   def __init__(self, expr, lines):
     self.lines = lines
     self.expr = expr
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #gen : save the return value
     #gen : return
-    code = []
+    code = ctx.code
     if self.expr is not None:
-      code += self.expr.generate_code()
-      code.append(("#return",))
-      code.append(('move', 'a0', self.expr.register))
-    self.register = "a0"
-    code += absmc.ret(current_method.get_label())
-    return code
+      self.expr.generate_code(ctx)
+      code.emit(COMMENT, RETURN_COMMENT)
+      code.emit(MOVE, A0, self.expr.register)
+    self.register = A0
+    ctx.machine.ret(code, ctx.current_method.get_label())
+
+  def fold(self, ctx):
+    if self.expr is not None:
+      self.expr = self.expr.fold(ctx)
 
   # Check that the type of the expr is the same as the method return type
-  def check(self):
-    global curr_method_return
+  def check(self, ctx):
     # if doesn't return anything, make sure method signature is void type
     if self.expr == None:
-      if current_method.rtype.compatible(Type('void')):
-        curr_method_return = True
+      if ctx.current_method.rtype.compatible(ctx.types.get('void'), ctx):
+        ctx.curr_method_return = True
         return True
       else:
-        print "{0}: Method '{1}' must return a value of type {2}".format(self.lines, current_method.name, current_method.rtype.typename)
+        ctx.error(self.lines, "Method '{0}' must return a value of type {1}".format(ctx.current_method.name, ctx.current_method.rtype.typename))
         return False
     #otherwise, check the expression and make sure it's compatibe w/ method signature
-    type_check = self.expr.check()
+    type_check = self.expr.check(ctx)
     if type_check:
-      if self.expr.type.compatible(current_method.rtype):
-        curr_method_return = True
+      if self.expr.type.compatible(ctx.current_method.rtype, ctx):
+        ctx.curr_method_return = True
         return True
       else:
-        print "{0}: Cannot convert from {1} to {2}".format(self.lines, self.expr.type.typename, current_method.rtype.typename)
+        ctx.error(self.lines, "Cannot convert from {0} to {1}".format(self.expr.type.typename, ctx.current_method.rtype.typename))
     return False
 
   def printout(self):
@@ -734,28 +986,33 @@ class ReturnStmt(Stmt):
     print ")"
 
 class BlockStmt(Stmt):
+  __slots__ = ('stmtlist',)
   def __init__(self, stmtlist, lines):
     self.lines = lines
     self.stmtlist = [s for s in stmtlist if (s != None) and (not isinstance(s, SkipStmt))]
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #TODO: allocate variables and fields somewhere
     #might have to deal w/ activation record stuff?
 
     #generates code for each statement in the block
-    code = [('# Start block',)]
-    absmc.start_registers_scope()
+    code = ctx.code
+    code.emit(COMMENT, START_BLOCK_COMMENT)
+    ctx.machine.start_registers_scope()
     if self.stmtlist is not None:
       for stmt in self.stmtlist:
-        code += stmt.generate_code()
-    absmc.kill_registers_scope()
-    code.append(('# End block',))
-    return code
+        stmt.generate_code(ctx)
+    ctx.machine.kill_registers_scope()
+    code.emit(COMMENT, END_BLOCK_COMMENT)
+
+  def fold(self, ctx):
+    for stmt in self.stmtlist:
+      stmt.fold(ctx)
      
-  def check(self):
+  def check(self, ctx):
     success = True
     for s in self.stmtlist:
-      if not s.check():
+      if not s.check(ctx):
         success = False
     return success
 
@@ -769,65 +1026,70 @@ class BlockStmt(Stmt):
     print "])"
 
 class BreakStmt(Stmt):
+  __slots__ = ()
   def __init__(self, lines):
     self.lines = lines
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #can we guarentee that the there will always have a next label?
       #rodrigo said yes
-    code = [("#break",)]
+    code = ctx.code
+    code.emit(COMMENT, BREAK_COMMENT)
     #gen : jump out of the loop. to the next label
-    break_label = absmc.get_break_label()
+    break_label = ctx.machine.get_break_label()
     if break_label is not None:
-      code += absmc.jump(break_label)
+      ctx.machine.jump(code, break_label)
       #generate label for the next basic block
-      code += absmc.set_current_label(absmc.get_new_label(), False)
-      return code
+      ctx.machine.set_current_label(code, ctx.machine.get_new_label(), False)
     else:
-      raise CodeGenerationError('{0}: Unexpected break'.format(self.lines))
+      raise CodeGenerationError(self.lines, 'Unexpected break')
 
-  def check(self):
+  def check(self, ctx):
     return True
 
   def printout(self):
     print "Break"
     
 class ContinueStmt(Stmt):
+  __slots__ = ()
   def __init__(self, lines):
     self.lines = lines
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #gen : jump back to the current label
-    code = [("#continue",)]
-    continue_label = absmc.get_continue_label()
+    code = ctx.code
+    code.emit(COMMENT, CONTINUE_COMMENT)
+    continue_label = ctx.machine.get_continue_label()
     if continue_label is not None:
-      code.append(('jmp', continue_label))
-      code += absmc.jump(continue_label)
+      code.emit(JMP, code.intern(continue_label))
+      ctx.machine.jump(code, continue_label)
 
       #generate label for the next basic block
-      code += absmc.set_current_label(absmc.get_new_label(), False)
-      return code
+      ctx.machine.set_current_label(code, ctx.machine.get_new_label(), False)
     else:
-      raise CodeGenerationError('{0}: Unexpected continue'.format(self.lines))
+      raise CodeGenerationError(self.lines, 'Unexpected continue')
 
-  def check(self):
+  def check(self, ctx):
     return True
 
   def printout(self):
     print "Continue"
 
 class ExprStmt(Stmt):
+  __slots__ = ('expr', 'register')
   def __init__(self, expr, lines):
     self.lines = lines
     self.expr = expr
 
-  def generate_code(self):
-    code = self.expr.generate_code()
+  def generate_code(self, ctx):
+    self.expr.generate_code(ctx)
     self.register = self.expr.register
-    return code
 
-  def check(self):
-    return self.expr.check()
+  def fold(self, ctx):
+    self.expr = self.expr.fold(ctx)
+
+  def check(self, ctx):
+    return self.expr.check(ctx)
 
   def printout(self):
     print "Expr(",
@@ -835,15 +1097,15 @@ class ExprStmt(Stmt):
     print ")"
     
 class SkipStmt(Stmt):
+  __slots__ = ()
   def __init__(self, lines):
     self.lines = lines
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #nop
-    code = []
-    return code
+    pass
 
-  def check(self):
+  def check(self, ctx):
     return True
 
   def printout(self):
@@ -851,13 +1113,27 @@ class SkipStmt(Stmt):
     
 
 class Expr(object):
+  __slots__ = ('lines', 'type', 'register')
   def __repr__(self):
     return "Unknown expression"
   def printout(self):
     print self, 
 
+  def fold(self, ctx):
+    '''Folds the constants in the expression; returns the expression to
+       generate code for in its place'''
+    return self
+
+  def generate_cond(self, ctx, label, jump_if, follow):
+    '''Generates the expression as the condition of a branch: jumps to
+       label if its value is jump_if, and goes on to follow otherwise.
+       The caller places follow right after the code.'''
+    self.generate_code(ctx)
+    ctx.machine.branch(ctx.code, self.register, label, not jump_if)
+
 
 class ConstantExpr(Expr):
+  __slots__ = ('kind', 'data', 'int', 'float', 'string')
   def __init__(self, kind, arg=None, lines=None):
     self.lines = lines
     self.kind = kind
@@ -869,29 +1145,36 @@ class ConstantExpr(Expr):
     elif (kind == 'string'):
       self.string = arg
   
-  def generate_code(self):
+  def generate_code(self, ctx):
     #returns the constant value
-    self.register = absmc.generate_temporary_register()
-    code = [("#load constant : " + str(self.data),)]
+    self.register = ctx.machine.generate_temporary_register()
+    code = ctx.code
+    code.comment("#load constant : " + str(self.data))
     if self.kind == 'int':
-      args = (self.register, str(self.data))
-      code.append(('move_immed_i',) + args)
+      code.emit(MOVE_IMMED_I, self.register, code.intern(str(self.data)))
     elif self.kind == 'float':
-      args = (self.register, str(self.data))
-      code.append(('move_immed_f',) + args)
+      # repr() gives every digit needed to read the same value back; str()
+      # rounds to 12 significant digits
+      code.emit(MOVE_IMMED_F, self.register, code.intern(repr(self.data)))
     elif self.kind == 'True':
-      args = (self.register, '1')
-      code.append(('move_immed_i',) + args)
+      code.emit(MOVE_IMMED_I, self.register, code.intern('1'))
     elif self.kind == 'False' or self.kind == 'null':
-      args = (self.register, '0')
-      code.append(('move_immed_i',) + args)
-    return code
-
-  def check(self):
+      code.emit(MOVE_IMMED_I, self.register, code.intern('0'))
+
+  def generate_cond(self, ctx, label, jump_if, follow):
+    #the branch is decided already: jump or go on
+    code = ctx.code
+    code.comment("#constant condition : " + self.kind)
+    if (self.kind == 'True') == jump_if:
+      ctx.machine.jump(code, label)
+      #anything up to follow is unreachable
+      ctx.machine.set_current_label(code, ctx.machine.get_new_label(), False)
+
+  def check(self, ctx):
     if self.kind == 'True' or self.kind == 'False':
-      self.type = Type('boolean')
+      self.type = ctx.types.get('boolean')
     else:
-      self.type = Type(self.kind)
+      self.type = ctx.types.get(self.kind)
     return True
 
   def __repr__(self):
@@ -911,23 +1194,25 @@ class ConstantExpr(Expr):
     return "Constant({0})".format(s)
 
 class VarExpr(Expr):
+  __slots__ = ('var',)
   def __init__(self, var, lines):
     self.lines = lines
     self.var = var
   def __repr__(self):
     return "Variable(%d)"%self.var.id
   
-  def generate_code(self):
+  def generate_code(self, ctx):
     #return the register that corresponds w/ the variable
     self.register = self.var.register
-    code = [("#var expr : " + self.var.name,)]
-    return code
+    code = ctx.code
+    code.comment("#var expr : " + self.var.name)
 
-  def check(self):
+  def check(self, ctx):
     self.type = self.var.type
     return True
 
 class UnaryExpr(Expr):
+  __slots__ = ('uop', 'arg')
   def __init__(self, uop, expr, lines):
     self.lines = lines
     self.uop = uop
@@ -935,37 +1220,64 @@ class UnaryExpr(Expr):
   def __repr__(self):
     return "Unary({0}, {1})".format(self.uop, self.arg)
 
-  def generate_code(self):
+  def generate_code(self, ctx):
     #code = [" ".join(["#unary expr", self.uop, self.arg])]
-    code = []
-    code += self.arg.generate_code()
-    neg_one = absmc.generate_temporary_register()
-    self.register = absmc.generate_temporary_register()
+    code = ctx.code
+    self.arg.generate_code(ctx)
+    neg_one = ctx.machine.generate_temporary_register()
+    self.register = ctx.machine.generate_temporary_register()
     #TODO:we can check if its a constant, then just load it in
     #uminus -> just multiply by -1
-    code.append(("move_immed_i", neg_one, "-1"))
-    code.append(("imul", self.register, self.arg.register, neg_one))
+    code.emit(MOVE_IMMED_I, neg_one, code.intern("-1"))
+    code.emit(IMUL, self.register, self.arg.register, neg_one)
     
     if self.uop == 'neg':
     #negation -> multiply by -1 and add 1
-      code.append(("isub", self.register, self.register, neg_one))
+      code.emit(ISUB, self.register, self.register, neg_one)
     #print "UNARY"
     #print "\n".join(code)
-    return code
 
-  def check(self):
-    if self.arg.check():
-      if (self.uop == 'uminus' and (self.arg.type.compatible(Type('float')))\
-       or (self.uop == 'neg' and self.arg.type.compatible(Type('boolean')))):
+  def generate_cond(self, ctx, label, jump_if, follow):
+    if self.uop == 'neg':
+      #!x jumps where x would not
+      self.arg.generate_cond(ctx, label, not jump_if, follow)
+    else:
+      Expr.generate_cond(self, ctx, label, jump_if, follow)
+
+  def fold(self, ctx):
+    self.arg = self.arg.fold(ctx)
+    value = constant_value(self.arg)
+    if value is not None:
+      if self.uop == 'uminus':
+        folded = make_constant(ctx, -value, self.lines)
+      else:
+        folded = make_constant(ctx, not value, self.lines)
+      if folded is not None:
+        return folded
+    #!!b -> b
+    elif self.uop == 'neg' and isinstance(self.arg, UnaryExpr) \
+     and self.arg.uop == 'neg':
+      return operand(self.arg.arg, self)
+    return self
+
+  def check(self, ctx):
+    if self.arg.check(ctx):
+      if (self.uop == 'uminus' and (self.arg.type.compatible(ctx.types.get('float'), ctx))\
+       or (self.uop == 'neg' and self.arg.type.compatible(ctx.types.get('boolean'), ctx))):
         self.type = self.arg.type
         return True
       else:
-        print "{0}: Operator {1} not compatible with type {2}.".format(self.lines, self.uop, self.arg.type)
-    self.type = Type('error')
+        ctx.error(self.lines, "Operator {0} not compatible with type {1}.".format(self.uop, self.arg.type))
+    self.type = ctx.types.get('error')
     return False
 
-    
+
+# the instruction for each arithmetic and comparison operator
+INT_OPCODES = {'add': IADD, 'sub': ISUB, 'mul': IMUL, 'div': IDIV,
+               'gt': IGT, 'geq': IGEQ, 'lt': ILT, 'leq': ILEQ}
+
 class BinaryExpr(Expr):
+  __slots__ = ('bop', 'arg1', 'arg2')
   def __init__(self, bop, arg1, arg2, lines):
     self.lines = lines
     self.bop = bop
@@ -975,15 +1287,16 @@ class BinaryExpr(Expr):
   def __repr__(self):
     return "Binary({0}, {1}, {2})".format(self.bop, self.arg1, self.arg2)
 
-  def generate_code(self):
-    code = [("#binary expr : " + self.bop,)]
-    code += self.arg1.generate_code()
-    code += self.arg2.generate_code()
-    self.register = absmc.generate_temporary_register()
-    if self.bop in ['add', 'sub', 'mul', 'div', 'gt', 'geq', 'lt', 'leq']:
-      inst = 'i'+self.bop
-      args = (self.register, self.arg1.register, self.arg2.register)
-      code.append((inst,) + args)
+  def generate_code(self, ctx):
+    code = ctx.code
+    code.comment("#binary expr : " + self.bop)
+    if self.bop not in ['and', 'or']:
+      self.arg1.generate_code(ctx)
+      self.arg2.generate_code(ctx)
+    self.register = ctx.machine.generate_temporary_register()
+    if self.bop in INT_OPCODES:
+      code.emit(INT_OPCODES[self.bop], self.register, self.arg1.register,
+                self.arg2.register)
     #deal w/ eq/neq operations
     elif self.bop in ['eq', 'neq']:
       # Do an isub, then branch depending on if the value is zero or not
@@ -997,171 +1310,191 @@ class BinaryExpr(Expr):
           rest of code'''
       '''isub t0 t1 t2
           bz t0, L1 # Fail label'''
-      code.append(('isub', self.register, self.arg1.register, self.arg2.register))
+      code.emit(ISUB, self.register, self.arg1.register, self.arg2.register)
       
-      #curr_label = absmc.get_current_label()
-      succ_label = absmc.get_new_label()
-      fail_label = absmc.get_new_label()
-      rest_label = absmc.get_new_label()
+      #curr_label = ctx.machine.get_current_label()
+      succ_label = ctx.machine.get_new_label()
+      fail_label = ctx.machine.get_new_label()
+      rest_label = ctx.machine.get_new_label()
 
       #check failure
       if self.bop == 'eq':
-        code += absmc.branch(self.register, fail_label, False)
+        ctx.machine.branch(code, self.register, fail_label, False)
       else:
-        code += absmc.branch(self.register, fail_label, True)
+        ctx.machine.branch(code, self.register, fail_label, True)
 
       #if they're equal, 
-      code += absmc.set_current_label(succ_label, True)
+      ctx.machine.set_current_label(code, succ_label, True)
       #load 1
-      code.append(('move_immed_i', self.register, '1'))
+      code.emit(MOVE_IMMED_I, self.register, code.intern('1'))
       #and jump
-      code += absmc.jump(rest_label)
+      ctx.machine.jump(code, rest_label)
 
       #add in the fail label
-      code += absmc.set_current_label(fail_label, False)
+      ctx.machine.set_current_label(code, fail_label, False)
       #if they're not equal, load 0
-      code.append(('move_immed_i', self.register, '0'))
+      code.emit(MOVE_IMMED_I, self.register, code.intern('0'))
 
       #load in the label to denote where rest of code goes
-      code += absmc.set_current_label(rest_label, True)
-    elif self.bop == 'and':
+      ctx.machine.set_current_label(code, rest_label, True)
+    elif self.bop in ['and', 'or']:
       '''
-      x and y: 
-        if(x!=0):
-          if(y!=0):
-        ###
-        bz x, L1
-        bz y, L1
+      x and y / x or y:
+        <x and y (x or y) as a condition, jumping to L1 if false>
+        L0:
         move_immed_i $t0, 1
         jmp L2
-        L1: #XY = 0
+        L1:
         move_immed_i $t0, 0
         L2:
         <other stuff>
       '''
-      #curr_label = absmc.get_current_label()
-      x_succ_label = absmc.get_new_label()
-      y_succ_label = absmc.get_new_label()
-      fail_label = absmc.get_new_label()
-      rest_label = absmc.get_new_label()
-      
-      #if x is false, jmp to failure
-      #code.append(('bz', self.arg1.register, fail_label))
-      code += absmc.branch(self.arg1.register, fail_label, True)
-      
-      #x is true, check y
-      code += absmc.set_current_label(x_succ_label, True)
-      
-      #if y is false, jmp to failure
-      #code.append(('bz', self.arg2.register, fail_label))
-      code += absmc.branch(self.arg2.register, fail_label, True)
+      succ_label = ctx.machine.get_new_label()
+      fail_label = ctx.machine.get_new_label()
+      rest_label = ctx.machine.get_new_label()
 
-      #if x is true, y is true
-      code += absmc.set_current_label(y_succ_label, True)
+      #short-circuits: y is only evaluated if x does not decide the value
+      self.generate_cond(ctx, fail_label, False, succ_label)
+
+      ctx.machine.set_current_label(code, succ_label, True)
       #set to 1
-      code.append(('move_immed_i', self.register, '1'))
-      
+      code.emit(MOVE_IMMED_I, self.register, code.intern('1'))
       #skip pass the failures
-      code += absmc.jump(rest_label)
+      ctx.machine.jump(code, rest_label)
 
       #starting the failures
-      code += absmc.set_current_label(fail_label, False)
+      ctx.machine.set_current_label(code, fail_label, False)
       #failure => set to 0
-      code.append(('move_immed_i', self.register, '0'))
+      code.emit(MOVE_IMMED_I, self.register, code.intern('0'))
 
       #start the label denoting other stuff
-      code += absmc.set_current_label(rest_label, True)
+      ctx.machine.set_current_label(code, rest_label, True)
+
+  def generate_cond(self, ctx, label, jump_if, follow):
+    code = ctx.code
+    if self.bop in ['and', 'or']:
+      code.comment("#condition : " + self.bop)
+      #y is checked at y_label, only if x does not decide the condition
+      y_label = ctx.machine.get_new_label()
+      if (self.bop == 'and') == jump_if:
+        #x false (and) / true (or) decides the condition isn't jump_if
+        self.arg1.generate_cond(ctx, follow, not jump_if, y_label)
+      else:
+        #x false (and) / true (or) decides the condition is jump_if
+        self.arg1.generate_cond(ctx, label, jump_if, y_label)
+      ctx.machine.set_current_label(code, y_label, True)
+      self.arg2.generate_cond(ctx, label, jump_if, follow)
+    elif self.bop in ['eq', 'neq']:
+      #branch on the difference instead of making it a 0/1 value
+      code.comment("#condition : " + self.bop)
+      self.arg1.generate_code(ctx)
+      self.arg2.generate_code(ctx)
+      self.register = ctx.machine.generate_temporary_register()
+      code.emit(ISUB, self.register, self.arg1.register, self.arg2.register)
+      ctx.machine.branch(code, self.register, label,
+                                 (self.bop == 'eq') == jump_if)
+    else:
+      Expr.generate_cond(self, ctx, label, jump_if, follow)
+
+  def fold(self, ctx):
+    self.arg1 = self.arg1.fold(ctx)
+    self.arg2 = self.arg2.fold(ctx)
+    value1 = constant_value(self.arg1)
+    value2 = constant_value(self.arg2)
+    if value1 is not None and value2 is not None:
+      folded = make_constant(ctx, fold_binary(self.bop, value1, value2),
+                             self.lines)
+      if folded is not None:
+        return folded
+      return self
+
+    #identities; only for ints, where they hold for every value
+    if self.type.typename == 'int':
+      if self.bop == 'add':
+        if value2 == 0:
+          return operand(self.arg1, self)
+        elif value1 == 0:
+          return operand(self.arg2, self)
+      elif self.bop == 'sub':
+        if value2 == 0:
+          return operand(self.arg1, self)
+      elif self.bop == 'mul':
+        if value2 == 1:
+          return operand(self.arg1, self)
+        elif value1 == 1:
+          return operand(self.arg2, self)
+        elif (value2 == 0 and is_pure(self.arg1)) \
+         or (value1 == 0 and is_pure(self.arg2)):
+          return make_constant(ctx, 0, self.lines)
+      elif self.bop == 'div':
+        if value2 == 1:
+          return operand(self.arg1, self)
+
+    #a constant operand decides the result, or leaves it to the other one
+    elif self.bop == 'and':
+      if value1 is True:
+        return operand(self.arg2, self)
+      elif value1 is False:
+        return make_constant(ctx, False, self.lines)
+      elif value2 is True:
+        return operand(self.arg1, self)
+      elif value2 is False and is_pure(self.arg1):
+        return make_constant(ctx, False, self.lines)
     elif self.bop == 'or':
-      '''
-      x or y
-        if(x!=0):
-        elif(y!=0):
-        ###
-        bnz x, L1
-        bnz y, L1
-        move_immed_i $t0, 0
-        jmp L2
-        L1:
-        move_immed_i $t0, 1
-        L2:
-        <stuff>
-      '''
-      #curr_label = absmc.get_current_label()
-      x_fail_label = absmc.get_new_label()
-      y_fail_label = absmc.get_new_label()
-      success_label = absmc.get_new_label()
-      rest_label = absmc.get_new_label()
-
-      #if x is true, jmp to success
-      #code.append(('bnz', self.arg1.register, success_label))
-      code += absmc.branch(self.arg1.register, success_label, False)
-      
-      #x is false, check y
-      code += absmc.set_current_label(x_fail_label, True)
-      
-      #if y is true, jmp to success
-      #code.append(('bnz', self.arg2.register, success_label))
-      code += absmc.branch(self.arg2.register, success_label, False)
-
-      #x and y are false,
-      code += absmc.set_current_label(y_fail_label, True)
-      #set to 0
-      code.append(('move_immed_i', self.register, '0'))
-      #skip pass the failures
-      code += absmc.jump(rest_label)
-
-      #starting the successes
-      code += absmc.set_current_label(success_label, False)
-      #failure => set to 1
-      code.append(('move_immed_i', self.register, '1'))
-
-      #start the label denoting other stuff
-      code += absmc.set_current_label(rest_label, True)
-    return code
-
-  def check(self):
-    arg1_check = self.arg1.check()
-    arg2_check = self.arg2.check()
+      if value1 is False:
+        return operand(self.arg2, self)
+      elif value1 is True:
+        return make_constant(ctx, True, self.lines)
+      elif value2 is False:
+        return operand(self.arg1, self)
+      elif value2 is True and is_pure(self.arg1):
+        return make_constant(ctx, True, self.lines)
+    return self
+
+  def check(self, ctx):
+    arg1_check = self.arg1.check(ctx)
+    arg2_check = self.arg2.check(ctx)
     
     if arg1_check and arg2_check:
       #arithmetic operation
       if self.bop in ['add', 'sub', 'mul', 'div']:
         #if both args are int, it's of type int
         if self.arg2.type.typename == 'int' and self.arg1.type.typename == 'int':
-          self.type = Type('int')
+          self.type = ctx.types.get('int')
           return True
         #else if they're of type int and float, it's of type float
-        elif self.arg1.type.compatible(Type('float')) and self.arg2.type.compatible(Type('float')):
-          self.type = Type('float')
+        elif self.arg1.type.compatible(ctx.types.get('float'), ctx) and self.arg2.type.compatible(ctx.types.get('float'), ctx):
+          self.type = ctx.types.get('float')
           return True
 
       #boolean operation
       elif self.bop in ['and', 'or' ]:
         #if both args are of type boolean, it's of type boolean
-        if self.arg1.type.compatible(Type('boolean')) and self.arg2.type.compatible(Type('boolean')):
-          self.type = Type('boolean')
+        if self.arg1.type.compatible(ctx.types.get('boolean'), ctx) and self.arg2.type.compatible(ctx.types.get('boolean'), ctx):
+          self.type = ctx.types.get('boolean')
           return True
 
       #Arithmetic comparisons
       elif self.bop in ['gt', 'lt', 'geq', 'leq']:
         #if the're of type int or float, it's of type boolean
-        if self.arg1.type.compatible(Type('float')) and self.arg2.type.compatible(Type('float')):
-          self.type = Type('boolean')
+        if self.arg1.type.compatible(ctx.types.get('float'), ctx) and self.arg2.type.compatible(ctx.types.get('float'), ctx):
+          self.type = ctx.types.get('boolean')
           return True
 
       #Equality comparisons
       elif self.bop in ['eq', 'neq']:
         #if one arg is a subtype of another
-        if self.arg1.type.compatible(self.arg2.type) or self.arg2.type.compatible(self.arg1.type):
-          self.type = Type('boolean')
+        if self.arg1.type.compatible(self.arg2.type, ctx) or self.arg2.type.compatible(self.arg1.type, ctx):
+          self.type = ctx.types.get('boolean')
           return True
     
-      print "{0}: Operator {1} undefined for type(s) {2}, {3}.".format(self.lines, self.bop, self.arg1.type, self.arg2.type)
+      ctx.error(self.lines, "Operator {0} undefined for type(s) {1}, {2}.".format(self.bop, self.arg1.type, self.arg2.type))
     
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     return False
 
 class AssignExpr(Expr):
+  __slots__ = ('lhs', 'rhs')
   def __init__(self, lhs, rhs, lines):
     self.lines = lines
     self.lhs = lhs
@@ -1171,59 +1504,61 @@ class AssignExpr(Expr):
     print self.type
     return "Assign({0}, {1}, {2}, {3})".format(self.lhs, self.rhs, self.lhs.type, self.rhs.type)
 
-  def generate_code(self):
-    rhs = self.rhs.generate_code()
-    code = [("#assign expr",)]
+  def generate_code(self, ctx):
+    code = ctx.code
+    code.emit(COMMENT, ASSIGN_COMMENT)
+    mark = len(code)
+    self.rhs.generate_code(ctx)
 
     post_auto = False
     #write the code to set up lhs and rhs
     if isinstance(self.rhs, AutoExpr) and self.rhs.when == 'post':
       post_auto = True
-    else:
-      code += rhs
+      rhs = code.take(mark)
 
-    lhs = []
     #if lhs is a field, we want to store into heap
     if isinstance(self.lhs, FieldAccessExpr):
-      lhs = self.lhs.generate_code(self.rhs.register)
+      self.lhs.generate_code(ctx, self.rhs.register)
       self.register = self.rhs.register
     else:
-      lhs = self.lhs.generate_code()
+      self.lhs.generate_code(ctx)
       self.register = self.lhs.register
-    code += lhs
 
     #move the value of the rhs into the lhs
     if not isinstance(self.lhs, FieldAccessExpr):
-      args = (self.lhs.register, self.rhs.register)
-      code.append(('move',) + args)
+      code.emit(MOVE, self.lhs.register, self.rhs.register)
 
     if post_auto:
-      code += rhs
+      code.extend(rhs)
 
-    return code
+  def fold(self, ctx):
+    self.lhs = self.lhs.fold(ctx)
+    self.rhs = self.rhs.fold(ctx)
+    return self
 
-  def check(self):
+  def check(self, ctx):
     #check if they are None first
     if self.lhs is None or self.rhs is None:
-      self.type = Type('error')
+      self.type = ctx.types.get('error')
       return False
 
     #if lhs and rhs are type correct and rhs < lhs
-    lhs_check = self.lhs.check()
-    rhs_check = self.rhs.check()
+    lhs_check = self.lhs.check(ctx)
+    rhs_check = self.rhs.check(ctx)
 
     if lhs_check and rhs_check:
-      if self.rhs.type.compatible(self.lhs.type):
+      if self.rhs.type.compatible(self.lhs.type, ctx):
         self.type = self.rhs.type
         return True
       else:
-        print "{0}: Cannot assign argument of type {1} to variable/field of type {2}".format(self.lines, self.rhs.type, self.lhs.type)
+        ctx.error(self.lines, "Cannot assign argument of type {0} to variable/field of type {1}".format(self.rhs.type, self.lhs.type))
 
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     return False
     
     
 class AutoExpr(Expr):
+  __slots__ = ('arg', 'oper', 'when')
   def __init__(self, arg, oper, when, lines):
     self.lines = lines
     self.arg = arg
@@ -1233,37 +1568,42 @@ class AutoExpr(Expr):
   def __repr__(self):
     return "Auto({0}, {1}, {2})".format(self.arg, self.oper, self.when)
 
-  def generate_code(self):
-    code = self.arg.generate_code()
-    code += [("#auto expression",)]
+  def generate_code(self, ctx):
+    self.arg.generate_code(ctx)
+    code = ctx.code
+    code.emit(COMMENT, AUTO_COMMENT)
     self.register = self.arg.register
     #make a register holding 1
-    one_reg = absmc.generate_temporary_register()
-    code.append(('move_immed_i', one_reg, '1'))
+    one_reg = ctx.machine.generate_temporary_register()
+    code.emit(MOVE_IMMED_I, one_reg, code.intern('1'))
 
     #figure out the operations
     if self.oper == 'inc':
-      inst = 'iadd' 
+      inst = IADD
     elif self.oper == 'dec':
-      inst = 'isub'
+      inst = ISUB
     else:
-      raise CodeGenerationError('{0}: Invalid Auto Operation'.format(self.lines))
+      raise CodeGenerationError(self.lines, 'Invalid Auto Operation')
+
+    code.emit(inst, self.register, self.register, one_reg)
 
-    code.append((inst, self.register, self.register, one_reg))
-    return code
+  def fold(self, ctx):
+    self.arg = self.arg.fold(ctx)
+    return self
 
-  def check(self):
+  def check(self, ctx):
     #if arg is subtype of int
-    if self.arg.check() and self.arg.type.compatible(Type('float')):
+    if self.arg.check(ctx) and self.arg.type.compatible(ctx.types.get('float'), ctx):
       self.type = self.arg.type
       return True
 
     self.type = 'error'
-    if not self.arg.type.compatible(Type('error')):
-      print "{0}: The operator {1} is undefined for the argument type {2}".format(self.lines, self.oper, self.arg.type)
+    if not self.arg.type.compatible(ctx.types.get('error'), ctx):
+      ctx.error(self.lines, "The operator {0} is undefined for the argument type {1}".format(self.oper, self.arg.type))
     return False
     
 class FieldAccessExpr(Expr):
+  __slots__ = ('base', 'fname', 'field')
   def __init__(self, base, fname, lines):
     self.lines = lines
     self.base = base
@@ -1272,326 +1612,335 @@ class FieldAccessExpr(Expr):
     return "Field-access({0}, {1}, {2})".format(self.base, self.fname, self.field.id)
 
   #TODO: just set self.register to be value reg. avoids an extra move instruction
-  def generate_code(self, value=None):
+  def generate_code(self, ctx, value=None):
     #create a register and have it point to the sap+offset?
-    offset_reg = absmc.generate_temporary_register()
-    code = [("#field access : " + self.fname,)]
-    code += self.base.generate_code()
+    offset_reg = ctx.machine.generate_temporary_register()
+    code = ctx.code
+    code.comment("#field access : " + self.fname)
+    self.base.generate_code(ctx)
 
     #grabs the offset and stick it into $t0
-    code.append(('move_immed_i', offset_reg, str(self.field.offset)))
+    code.emit(MOVE_IMMED_I, offset_reg, code.intern(str(self.field.offset)))
     
     #check if static or instance
     if self.field.storage == 'static':
       #NOTE : we reuse the register containing the offset to do hload
       #load sap+offset and stick it into $t0
       if value is None:
-        dest = absmc.generate_temporary_register()
-        code.append(('hload', dest, 'sap', offset_reg))
+        dest = ctx.machine.generate_temporary_register()
+        code.emit(HLOAD, dest, SAP, offset_reg)
         self.register = dest
       #if a value is specified, we want to store, not load
       else:
-        code.append(('hstore', 'sap', offset_reg, value))
+        code.emit(HSTORE, SAP, offset_reg, value)
         self.register = value
     else:
       if value is None:
-        dest = absmc.generate_temporary_register()
+        dest = ctx.machine.generate_temporary_register()
         #load base+offset and set it into $t0
-        code.append(('hload', dest, self.base.register, offset_reg))
+        code.emit(HLOAD, dest, self.base.register, offset_reg)
         self.register = dest
       else:
         #if a value is specified, we want to store, not load
-        code.append(('hstore', self.base.register, offset_reg, value))
+        code.emit(HSTORE, self.base.register, offset_reg, value)
         self.register = value
 
-    return code
+  def fold(self, ctx):
+    self.base = self.base.fold(ctx)
+    return self
 
-  def check(self):
-    base_check = self.base.check()
+  def check(self, ctx):
+    base_check = self.base.check(ctx)
     if base_check:
       if self.base.type.kind == 'class' or self.base.type.kind == 'class-literal':
-        cls = lookup(classtable, self.base.type.typename)
+        cls = lookup(ctx.classtable, self.base.type.typename)
         #if actual class doesn't exist
         if cls is None:
-          print "{0}: Class '{1}' does not exist".format(self.lines, self.base.type.typename)
-          self.type = Type('error')
+          ctx.error(self.lines, "Class '{0}' does not exist".format(self.base.type.typename))
+          self.type = ctx.types.get('error')
           return False
-        #loop through super classes
-        while cls is not None:
-          field = lookup(cls.fields, self.fname)
-          #can't find field, go look in super
-          if field is None:
-            cls = cls.superclass
-            continue
+        #the nearest declaration of the field, in cls or a super class
+        field = cls.all_fields.get(self.fname)
+        if field is not None:
           if (field.storage == 'instance' and self.base.type.kind == 'class') or \
            (field.storage == 'static' and self.base.type.kind == 'class-literal'):
-            if field.inclass == current_class or field.visibility == 'public':
+            if field.inclass == ctx.current_class or field.visibility == 'public':
               self.type = field.type
               self.field = field
               return True
             else:
-              print "{0}: Cannot access private member in class '{1}'".format(self.lines, field.inclass.name)
-              self.type = Type('error')
+              ctx.error(self.lines, "Cannot access private member in class '{0}'".format(field.inclass.name))
+              self.type = ctx.types.get('error')
               return False
           elif field.storage == 'static' and self.base.type.kind == 'class':
-            print "{0}: Cannot access static field '{1}' as an instance field".format(self.lines, self.fname)
-            self.type = Type('error')
+            ctx.error(self.lines, "Cannot access static field '{0}' as an instance field".format(self.fname))
+            self.type = ctx.types.get('error')
             return False
           else:
-            print "{0}: Cannot access instance field '{1}' as a static field".format(self.lines, self.fname)
-            self.type = Type('error')
+            ctx.error(self.lines, "Cannot access instance field '{0}' as a static field".format(self.fname))
+            self.type = ctx.types.get('error')
             return False
 
-        print "{0}: Reference '{1}' does not exist.".format(self.lines, self.fname)
-        self.type = Type('error')
+        ctx.error(self.lines, "Reference '{0}' does not exist.".format(self.fname))
+        self.type = ctx.types.get('error')
         return False
       else:
-        print "{0}: '{1}' is not a class type".format(self.lines, self.base.type.typename)
+        ctx.error(self.lines, "'{0}' is not a class type".format(self.base.type.typename))
 
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     return False
 
     
 class MethodInvocationExpr(Expr):
+  __slots__ = ('base', 'mname', 'args', 'args_valid', 'method')
   def __init__(self, field, args, lines):
     self.lines = lines
     self.base = field.base
     self.mname = field.fname
     self.args = args
+    # result of check() for each argument, once it has been checked
+    self.args_valid = [None] * len(args)
   def __repr__(self):
     return "Method-call({0}, {1}, {2}, {3})".format(self.base, self.mname, self.args, self.method.id)
 
-  def generate_code(self):
-    code = [("#calling method : " + self.method.name,)]
-    code += self.base.generate_code()
+  def generate_code(self, ctx):
+    code = ctx.code
+    start = len(code)
+    code.comment("#calling method : " + self.method.name)
+    self.base.generate_code(ctx)
     #call label (M_<method_name>_<method_id>)
     #TODO: check arguments if they involve auto expressions. if post inc, do it after moving them to a registers
     
     #save all of caller's a registers
-    num_regs_to_save = len(current_method.vars.get_params())
+    num_regs_to_save = len(ctx.current_method.vars.get_params())
 
     # Figure out if a0 needs to be saved or not
-    if isinstance(current_method, Constructor) or current_method.storage == 'instance':
+    if isinstance(ctx.current_method, Constructor) or ctx.current_method.storage == 'instance':
       num_regs_to_save += 1
-    for i in range(num_regs_to_save):
-      code.append(('save', 'a'+ str(i)))
+    code.emit_each(SAVE, [amicode.argument(i) for i in range(num_regs_to_save)])
 
-    absmc.reset_argument_register(self.method.storage)
+    ctx.machine.reset_argument_register(self.method.storage)
     #set up the a registers
     if self.method.storage == 'instance':
       # if the base is not super or this, then it needs to be moved to a0
       if not (isinstance(self.base, ThisExpr) or isinstance(self.base, SuperExpr)):
-        code.append(('move', 'a0', self.base.register))
+        code.emit(MOVE, A0, self.base.register)
 
+    #(argument register, value register) pairs
     arg_setup = []
-    post_auto_args = []
+    post_auto_args = amicode.CodeBuffer(code.table)
     for arg in self.args:
-      arg_code = arg.generate_code()
+      mark = len(code)
+      arg.generate_code(ctx)
       if isinstance(arg, AutoExpr) and arg.when == 'post':
-        post_auto_args += arg_code
+        post_auto_args.extend(code.take(mark))
       elif isinstance(arg, AutoExpr) and arg.when == 'pre':
-        code = arg_code + code
-      else:
-        code += arg_code
-      curr_reg = absmc.generate_argument_register()
+        #goes before all the code for the call
+        code.insert(start, code.take(mark))
+      curr_reg = ctx.machine.generate_argument_register()
       curr_value = arg.register
       #this prevents moving a register into the same register
       if curr_reg == curr_value:
         continue
       if absmc.is_prev_arg(curr_value, curr_reg):
         #save the original $a value
-        temp_reg = absmc.generate_temporary_register()
+        temp_reg = ctx.machine.generate_temporary_register()
         #move the prev $a register into a $t register
-        code.append(('move', temp_reg, curr_value))
+        code.emit(MOVE, temp_reg, curr_value)
         curr_value = temp_reg
-      arg_setup.append(('move', curr_reg, curr_value))
+      arg_setup.append((curr_reg, curr_value))
     #add the arg setup stuff into code
-    code += arg_setup
+    for (reg, value) in arg_setup:
+      code.emit(MOVE, reg, value)
 
     #save temp registers
-    for t in absmc.get_live_registers():
-      code.append(('save', t))
+    code.emit_each(SAVE, ctx.machine.get_live_registers())
 
     #actually call the method
-    code += absmc.call(self.method.get_label())
+    ctx.machine.call(code, self.method.get_label())
 
     #restore all of the original temp registers
-    for t in reversed(absmc.get_live_registers()):
-      code.append(('restore', t))
+    code.emit_each(RESTORE, reversed(ctx.machine.get_live_registers()))
 
     #save the return value
-    self.register = absmc.generate_temporary_register()
-    code.append(('move', self.register, 'a0'))
+    self.register = ctx.machine.generate_temporary_register()
+    code.emit(MOVE, self.register, A0)
 
     #restore all the original arguments
-    for i in reversed(range(num_regs_to_save)):
-      code.append(('restore', 'a' + str(i)))
+    code.emit_each(RESTORE, [amicode.argument(i)
+                             for i in reversed(range(num_regs_to_save))])
 
-    code += post_auto_args
+    code.extend(post_auto_args)
 
-    return code
+  def fold(self, ctx):
+    self.base = self.base.fold(ctx)
+    self.args = [arg.fold(ctx) for arg in self.args]
+    return self
 
-  def check(self):
+  def check(self, ctx):
     self.method = None
-    base_check = self.base.check()
+    base_check = self.base.check(ctx)
     if base_check:
       basetype = self.base.type.kind
       if basetype == 'class' or basetype == 'class-literal':
-        cls = lookup(classtable, self.base.type.typename)
+        cls = lookup(ctx.classtable, self.base.type.typename)
         if cls is None:
-          print "{0}: Class '{1}' does not exist".format(self.lines, self.base.type.typename)
-          self.type = Type('error')
+          ctx.error(self.lines, "Class '{0}' does not exist".format(self.base.type.typename))
+          self.type = ctx.types.get('error')
           return False
+        if basetype == 'class':
+          storage = 'instance'
+        else:
+          storage = 'static'
         while cls is not None:
           found_exact_method = False
           mult_applicable = False
-          for method in cls.methods:
-            if self.mname == method.name \
-              and (method.inclass == current_class or method.visibility == 'public')\
-              and ((basetype == 'class' and method.storage == 'instance') \
-                or (basetype == 'class-literal' and method.storage == 'static')):
+          for method in cls.find_methods(self.mname, storage, len(self.args)):
+            if method.inclass == ctx.current_class or method.visibility == 'public':
               #check arguments
               method_params = method.vars.get_params()
               params_match = True
               exact_match = True
               
-              if len(method_params) == len(self.args):
-                for i in range(0, len(method_params)):
-                  valid_arg = self.args[i].check() 
-                  #check if arg type is exactly the same as method's curr param type
-                  if not valid_arg \
-                    or (self.args[i].type.typename != method_params[i].type.typename):
-                    exact_match = False
-                  #check if curr arg is compatible w/ curr method's curr param
-                  if not valid_arg \
-                    or not self.args[i].type.compatible(method_params[i].type):
-                    params_match = False
-                    break
-                #check if all params had matched
-                if params_match:
-                  #if a previous method was found, but neither methods were exact match, flag it
-                  if self.method is not None and not exact_match and not found_exact_method:
-                    mult_applicable = True
-                  #if a previous method was found and this was an exact match
-                  elif self.method is not None and exact_match:
-                    #if the prev. method was also an exact match, error
-                    if found_exact_method:
-                      print "{0}: There are multiple applicable methods '{1}'.".format(self.lines, self.mname)
-                      self.type = Type('error')
-                      self.method = None
-                      return False
-                    #else, reset mult_applicable, and flag found_exact_method
-                    mult_applicable = False
+              for i in range(0, len(method_params)):
+                valid_arg = check_arg(ctx, self, i)
+                #check if arg type is exactly the same as method's curr param type
+                if not valid_arg \
+                  or (self.args[i].type.typename != method_params[i].type.typename):
+                  exact_match = False
+                #check if curr arg is compatible w/ curr method's curr param
+                if not valid_arg \
+                  or not self.args[i].type.compatible(method_params[i].type, ctx):
+                  params_match = False
+                  break
+              #check if all params had matched
+              if params_match:
+                #if a previous method was found, but neither methods were exact match, flag it
+                if self.method is not None and not exact_match and not found_exact_method:
+                  mult_applicable = True
+                #if a previous method was found and this was an exact match
+                elif self.method is not None and exact_match:
+                  #if the prev. method was also an exact match, error
+                  if found_exact_method:
+                    ctx.error(self.lines, "There are multiple applicable methods '{0}'.".format(self.mname))
+                    self.type = ctx.types.get('error')
+                    self.method = None
+                    return False
+                  #else, reset mult_applicable, and flag found_exact_method
+                  mult_applicable = False
+                  found_exact_method = True
+                  self.method = method
+                #found first match
+                elif self.method is None:
+                  self.method = method
+                  self.type = method.rtype
+                  if exact_match:
                     found_exact_method = True
-                    self.method = method
-                  #found first match
-                  elif self.method is None:
-                    self.method = method
-                    self.type = method.rtype
-                    if exact_match:
-                      found_exact_method = True
           if mult_applicable:
-            print "{0}: There are multiple applicable methods '{1}'.".format(self.lines, self.mname)
-            self.type = Type('error')
+            ctx.error(self.lines, "There are multiple applicable methods '{0}'.".format(self.mname))
+            self.type = ctx.types.get('error')
             return False
           if self.method is not None:
             return True
           cls = cls.superclass
 
         if self.method is None:
-          print "{0}: There are no applicable methods '{1}'.".format(self.lines, self.mname)
+          ctx.error(self.lines, "There are no applicable methods '{0}'.".format(self.mname))
         
       else:
-        print "{0}: '{1}' is not a class type".format(self.lines, self.base.type.typename)
+        ctx.error(self.lines, "'{0}' is not a class type".format(self.base.type.typename))
 
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     self.method = None
     return False
     
 class NewObjectExpr(Expr):
+  __slots__ = ('classref', 'args', 'args_valid', 'constructor')
   def __init__(self, cref, args, lines):
     self.lines = lines
     self.classref = cref
     self.args = args
+    # result of check() for each argument, once it has been checked
+    self.args_valid = [None] * len(args)
   def __repr__(self):
     return "New-object({0}, {1}, {2})".format(self.classref.name, self.args, self.constructor.id)
 
-  def generate_code(self):
-    code = [("#creating a new object : " + self.constructor.name,)]
+  def generate_code(self, ctx):
+    code = ctx.code
+    start = len(code)
+    code.comment("#creating a new object : " + self.constructor.name)
     
     #save all of caller's a registers
-    num_regs_to_save = len(current_method.vars.get_params())
+    num_regs_to_save = len(ctx.current_method.vars.get_params())
 
     # Figure out if a0 needs to be saved or not
-    if isinstance(current_method, Constructor) or current_method.storage == 'instance':
+    if isinstance(ctx.current_method, Constructor) or ctx.current_method.storage == 'instance':
       num_regs_to_save += 1
-    for i in range(num_regs_to_save):
-      code.append(('save', 'a' + str(i)))
+    code.emit_each(SAVE, [amicode.argument(i) for i in range(num_regs_to_save)])
 
-    absmc.reset_argument_register('instance')
+    ctx.machine.reset_argument_register('instance')
     #set up the a registers
     
     #set up $a0 here
-    # Count the number of instance fields in the class
-    num_instance = 0
-    for field in self.classref.fields.values():
-      if field.storage != 'static':
-        num_instance += 1
-
-    size_reg = absmc.generate_temporary_register()
-    code.append(('move_immed_i', size_reg, str(num_instance)))
+    # the object holds all the class's instance fields, inherited ones too
+    size_reg = ctx.machine.generate_temporary_register()
+    code.emit(MOVE_IMMED_I, size_reg,
+              code.intern(str(self.classref.heap_size)))
     #NOTE : we are reusing the register containing # of heap cells for halloc'ing the obj
-    self.register = absmc.generate_temporary_register()
-    code.append(('halloc', self.register, size_reg))
+    self.register = ctx.machine.generate_temporary_register()
+    code.emit(HALLOC, self.register, size_reg)
+    #(argument register, value register) pairs
     arg_setup = []
-    post_auto_args = []
-    arg_setup.append(('move', 'a0', self.register))
+    post_auto_args = amicode.CodeBuffer(code.table)
+    arg_setup.append((A0, self.register))
     for arg in self.args:
-      arg_code = arg.generate_code()
+      mark = len(code)
+      arg.generate_code(ctx)
       if isinstance(arg, AutoExpr) and arg.when == 'post':
-        post_auto_args += arg_code
+        post_auto_args.extend(code.take(mark))
       elif isinstance(arg, AutoExpr) and arg.when == 'pre':
-        code = arg_code + code
-      else:
-        code += arg_code
+        #goes before all the code for the call
+        code.insert(start, code.take(mark))
 
-      curr_reg = absmc.generate_argument_register()
+      curr_reg = ctx.machine.generate_argument_register()
       curr_value = arg.register
       #this prevents moving a register into the same register
       if curr_reg == curr_value:
         continue
       if absmc.is_prev_arg(curr_value, curr_reg):
         #save the original $a value
-        temp_reg = absmc.generate_temporary_register()
+        temp_reg = ctx.machine.generate_temporary_register()
         #move the prev $a register into a $t register
-        code.append(('move', temp_reg, curr_value))
+        code.emit(MOVE, temp_reg, curr_value)
         curr_value = temp_reg
-      arg_setup.append(('move', curr_reg, curr_value))
+      arg_setup.append((curr_reg, curr_value))
     #add the arg setup stuff into code
-    code += arg_setup
+    for (reg, value) in arg_setup:
+      code.emit(MOVE, reg, value)
 
 
     #save temp registers
-    for t in absmc.get_live_registers():
-      code.append(('save', t))
+    code.emit_each(SAVE, ctx.machine.get_live_registers())
 
     #actually call the method
-    code += absmc.call(self.constructor.get_label())
+    ctx.machine.call(code, self.constructor.get_label())
     
     #restore all of the original temp registers
-    for t in reversed(absmc.get_live_registers()):
-      code.append(('restore', t))
+    code.emit_each(RESTORE, reversed(ctx.machine.get_live_registers()))
     #restore all the original arguments
-    for i in reversed(range(num_regs_to_save)):
-      code.append(('restore', 'a' + str(i)))
+    code.emit_each(RESTORE, [amicode.argument(i)
+                             for i in reversed(range(num_regs_to_save))])
 
-    code += post_auto_args
+    code.extend(post_auto_args)
     #print 'NEW OBJECT INVOCATION'
     #print '\n'.join(code)
 
-    return code
+  def fold(self, ctx):
+    self.args = [arg.fold(ctx) for arg in self.args]
+    return self
 
-  def check(self):
+
+  def check(self, ctx):
     '''look for constructor that accepts args of this type'''
     self.constructor = None
     self.type = None
@@ -1600,27 +1949,25 @@ class NewObjectExpr(Expr):
     mult_applicable = False
     #flag for if we found an exact constructor
     found_exact_construct = False
-    #loop through class's constructors
-    for constructor in self.classref.constructors:
+    #loop through class's constructors taking this many arguments
+    for constructor in self.classref.find_constructors(len(self.args)):
       #if constructor is private and it's not used in scope of class, skip constr.
-      if current_class.name != self.classref.name \
+      if ctx.current_class.name != self.classref.name \
         and constructor.visibility == 'private':
         continue
       #loop through arguments
       exact_match = True
       args_match = True
       curr_args = constructor.vars.get_params()
-      if len(curr_args) != len(self.args):
-        continue
       for i in range(0, len(self.args)):
-        valid_arg = self.args[i].check() 
+        valid_arg = check_arg(ctx, self, i)
         #check if arg type is exactly the same as method's curr param type
         if not valid_arg \
           or (self.args[i].type.typename != curr_args[i].type.typename):
           exact_match = False
         #check if curr arg is compatible w/ curr method's curr param
         if not valid_arg \
-          or not self.args[i].type.compatible(curr_args[i].type):
+          or not self.args[i].type.compatible(curr_args[i].type, ctx):
           args_match = False
           break
       #check if all params had matched
@@ -1632,8 +1979,8 @@ class NewObjectExpr(Expr):
         elif self.constructor is not None and exact_match:
           #if the prev. constructor was also an exact match, error
           if found_exact_constructor:
-            print "{0}: Multiple applicable constructors for class '{1}' found.".format(self.lines, self.classref.name)
-            self.type = Type('error')
+            ctx.error(self.lines, "Multiple applicable constructors for class '{0}' found.".format(self.classref.name))
+            self.type = ctx.types.get('error')
             self.constructor = None
             return False
           #else, reset mult_applicable, and flag found_exact_constructor
@@ -1643,79 +1990,82 @@ class NewObjectExpr(Expr):
         #first time we find a match
         elif self.constructor is None:
           self.constructor = constructor
-          self.type = Type(self.classref.name)
+          self.type = ctx.types.get(self.classref.name)
           if exact_match:
             found_exact_constructor = True
     if mult_applicable:
-      print "{0}: Multiple applicable constructors for class '{1}' found.".format(self.lines, self.classref.name)
+      ctx.error(self.lines, "Multiple applicable constructors for class '{0}' found.".format(self.classref.name))
     elif self.constructor is not None:
-      self.type = Type(self.classref.name)
+      self.type = ctx.types.get(self.classref.name)
       return True
     elif self.constructor is None:
-      print "{0}: No applicable constructor for class '{1}' found.".format(self.lines, self.classref.name)
+      ctx.error(self.lines, "No applicable constructor for class '{0}' found.".format(self.classref.name))
     self.constructor = None
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     return False
 
 class ThisExpr(Expr):
+  __slots__ = ()
   def __init__(self, lines):
     self.lines = lines
   def __repr__(self):
     return "This"
   
-  def generate_code(self):
-    self.register = "a0"
-    code = [("#this expr",)]
-    return code
-
-  def check(self):
-    if is_constructor or current_method.storage != 'static':
-      self.type = Type(current_class.name)
+  def generate_code(self, ctx):
+    self.register = A0
+    code = ctx.code
+    code.emit(COMMENT, THIS_COMMENT)
+
+  def check(self, ctx):
+    if ctx.is_constructor or ctx.current_method.storage != 'static':
+      self.type = ctx.types.get(ctx.current_class.name)
       return True
-    print "{0}: Cannot use this in a static context".format(self.lines)
-    self.type = Type('error')
+    ctx.error(self.lines, "Cannot use this in a static context")
+    self.type = ctx.types.get('error')
     return False
 
 class SuperExpr(Expr):
+  __slots__ = ()
   def __init__(self, lines):
     self.lines = lines
   def __repr__(self):
     return "Super"
 
-  def generate_code(self):
-    code = [('# super expr',)]
-    self.register = "a0"
-    return code
+  def generate_code(self, ctx):
+    code = ctx.code
+    code.emit(COMMENT, SUPER_COMMENT)
+    self.register = A0
 
-  def check(self):
+  def check(self, ctx):
     #check if current class has a super class
-    if current_class.superclass is not None and (is_constructor or current_method.storage != 'static'):
-      self.type = Type(current_class.superclass.name)
+    if ctx.current_class.superclass is not None and (ctx.is_constructor or ctx.current_method.storage != 'static'):
+      self.type = ctx.types.get(ctx.current_class.superclass.name)
       return True
-    elif (not is_constructor) and current_method.storage == 'static':
-      print "{0}: Cannot use super in a static context".format(self.lines)
+    elif (not ctx.is_constructor) and ctx.current_method.storage == 'static':
+      ctx.error(self.lines, "Cannot use super in a static context")
     else:
-      print "{0}: There is no superclass for this class".format(self.lines)
+      ctx.error(self.lines, "There is no superclass for this class")
 
-    self.type = Type('error')
+    self.type = ctx.types.get('error')
     return False
     
 class ClassReferenceExpr(Expr):
+  __slots__ = ('classref',)
   def __init__(self, cref, lines):
     self.lines = lines
     self.classref = cref
   def __repr__(self):
     return "ClassReference({0})".format(self.classref.name)
 
-  def generate_code(self):
-    code = []
-    return code
+  def generate_code(self, ctx):
+    pass
 
-  def check(self):
-    self.type = Type(self.classref.name, True)
+  def check(self, ctx):
+    self.type = ctx.types.get(self.classref.name, True)
     return True
     
 class ArrayAccessExpr(Expr):
+  __slots__ = ('base', 'index')
   def __init__(self, base, index, lines):
     self.lines = lines
     self.base = base
@@ -1724,6 +2074,7 @@ class ArrayAccessExpr(Expr):
     return "Array-access({0}, {1})".format(self.base, self.index)
     
 class NewArrayExpr(Expr):
+  __slots__ = ('basetype', 'args')
   def __init__(self, basetype, args, lines):
     self.lines = lines
     self.basetype = basetype
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+import absmc
+import amicode
+import ast
+import peephole
+import phasetimer
+
+class Context(object):
+  """Everything that belongs to a single compilation.
+
+     A fresh Context is created for every program compiled and handed to
+     the parser, check() and generate_code(); nothing is kept at module
+     level, so several programs can be compiled in one process, one after
+     another or at the same time."""
+  def __init__(self):
+    # class table, keyed by class name; starts out with In and Out
+    self.classtable = OrderedDict()
+    self.lastmethod = 0
+    self.lastconstructor = 0
+    self.lastfield = 0
+
+    # set while going down a class during type checking/code generation
+    self.current_class = None
+    self.current_method = None
+    self.is_constructor = False
+    self.curr_method_return = False
+
+    # registers, labels, static area and control flow graph
+    self.machine = absmc.AbstractMachine()
+    # labels, immediates and comments of the generated code, shared by all
+    # its buffers
+    self.strings = amicode.StringTable()
+    # code of the method being generated; generate_code() emits into it
+    self.code = amicode.CodeBuffer(self.strings)
+    # the peephole pass the generated code goes through, with its counts
+    # of how often each rule applied
+    self.peephole = peephole.Peephole()
+
+    # (line, message) pairs, in the order they were found
+    self.diagnostics = []
+
+    # parser state
+    self.errorflag = False
+    self.current_type = None
+    self.current_context = None
+    self.current_modifiers = None
+    self.current_vartable = None
+    self.current_variable_kind = None
+
+    # a phasetimer.PhaseTimer when the compile is being timed
+    self.timer = None
+
+    # the Types used in this compile (ast.TypeTable)
+    self.types = ast.TypeTable()
+
+    ast.initialize_ast(self)
+
+  def error(self, lineno, message):
+    self.diagnostics.append((lineno, message))
+
+  def new_method_id(self):
+    self.lastmethod += 1
+    return self.lastmethod
+
+  def new_constructor_id(self):
+    self.lastconstructor += 1
+    return self.lastconstructor
+
+  def new_field_id(self):
+    self.lastfield += 1
+    return self.lastfield
+
+  def take_code(self):
+    '''Returns the code generated since the last call, packed, and starts
+       a new buffer for the next method'''
+    code = self.code
+    code.pack()
+    self.code = amicode.CodeBuffer(self.strings)
+    return code
+
+  def phase(self, name):
+    '''Context manager timing the enclosed statements as phase name, if
+       this compile is being timed'''
+    if self.timer is None:
+      return phasetimer.NO_PHASE
+    return self.timer.phase(name)
@@ -0,0 +1,408 @@
+""" Decaf compiler benchmark
+Compiles programs made by decafgen.py at a range of sizes and reports the
+time taken by each phase of the compiler, its throughput in source lines
+per second and how it scales with the size of the program.
+Usage: python decafbench.py [options]
+
+Options:
+  -h, --help              print this message
+  --sizes=N,N,...         multiples of the --scale option to generate
+                          programs at (default: 1,2,4,8)
+  --scale=OPTION          the decafgen.py option the sizes multiply, e.g.
+                          "statements" to grow each method body
+                          (default: classes)
+  --repeat=N              runs per size; the fastest is reported
+                          (default: 3)
+  --max-exponent=X        flag a phase as superlinear if its time grows
+                          faster than size**X (default: 1.25)
+  --no-ssa                skip the SSA pass
+  --lexer=NAME            scanner to time: "fast" (default) or "ply"
+  --memory                instead of timing, compile the program at the
+                          largest size and report the memory taken by
+                          its AST nodes
+  --peephole              instead of timing, report how many instructions
+                          the peephole pass takes out of the programs in
+                          tests/ and of the generated program at each size
+  and any decafgen.py option (--classes, --depth, --methods, ...) to set
+  the shape of the programs; --classes defaults to 4 here.
+
+With --memory, the nodes (statements, expressions, variables, fields and
+types) still alive after code generation are counted by class, with their
+size in bytes including any attribute dict.  For comparison, "dict
+bytes" is what the same nodes take as plain objects keeping the same
+attributes in an attribute dict, as they did before they had __slots__.
+
+With --peephole, each program's instructions (not counting labels and
+comments) are counted before and after the peephole pass, and the times
+each rule applied are summed over all of them.  Each program's whole
+compile, from the source to the written .ami text, is also timed with
+the pass ("compile s") and without it ("no pass s"), the fastest of
+--repeat runs.
+
+Phases: lex (the scanner alone), parse (excluding lexing and checking),
+check (Class.check() and constant folding), codegen
+(ast.generate_code() and the peephole pass), format (the .ami text) and ssa
+(AbstractMachine.generate_ssa(), shown as "-" where the pass fails on
+the program).  The exponent of a phase is the slope of log(time) against log(lines) over all sizes; about 1
+is linear.  Exits with status 1 if any phase is flagged.
+"""
+import sys
+import os
+import gc
+import math
+import time
+import getopt
+from collections import OrderedDict
+
+import decafparser
+import decafgen
+import decafc
+import ast
+import amicode
+import peephole
+import phasetimer
+from context import Context
+from decafgen import Usage
+
+PHASES = ['lex', 'parse', 'check', 'codegen', 'format', 'ssa']
+
+def time_lexer(source):
+  lexer = decafparser.new_lexer(Context())
+  start = time.time()
+  lexer.input(source)
+  while lexer.token():
+    pass
+  return time.time() - start
+
+def time_compile(source, ssa):
+  '''Compiles source once; returns the time of each phase but lex'''
+  timer = phasetimer.PhaseTimer()
+  ctx = Context()
+  ctx.timer = timer
+  with timer.phase('parse'):
+    decafparser.new_parser(ctx).parse(source, lexer=decafparser.new_lexer(ctx))
+  if ctx.errorflag:
+    raise RuntimeError('generated program has errors: %r' % ctx.diagnostics[:5])
+  with timer.phase('codegen'):
+    code = amicode.CodeBuffer(ctx.strings)
+    for method in ctx.peephole.optimize(ast.generate_code(ctx)):
+      code.extend(method)
+  with timer.phase('format'):
+    decafc.render(code)
+  times = dict((name, entry['wall']) for (name, entry) in timer.phases.items())
+  times['check'] = times.get('parse/check', 0.0) + times.get('parse/fold', 0.0)
+  times['parse'] -= times['check']
+  times['ssa'] = None
+  if ssa:
+    # the SSA pass prints as it goes, and fails on some programs
+    saved = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+      start = time.time()
+      ctx.machine.rebuild_cfg(code)
+      ctx.machine.generate_ssa(code)
+      times['ssa'] = time.time() - start
+    except Exception:
+      pass
+    finally:
+      sys.stdout.close()
+      sys.stdout = saved
+  return times
+
+def measure(source, repeat, ssa):
+  '''Fastest time of each phase over repeat runs'''
+  best = {}
+  for i in range(repeat):
+    gc.collect()
+    times = time_compile(source, ssa)
+    times['lex'] = time_lexer(source)
+    for name in PHASES:
+      t = times[name]
+      if t is not None and (best.get(name) is None or t < best[name]):
+        best[name] = t
+      elif name not in best:
+        best[name] = None
+  # parse times were taken with lexing included
+  if best['parse'] is not None:
+    best['parse'] = max(0.0, best['parse'] - best['lex'])
+  return best
+
+def exponent(points):
+  '''Least squares slope of log(t) against log(lines)'''
+  points = [(math.log(n), math.log(t)) for (n, t) in points if t and t > 0]
+  if len(points) < 2:
+    return None
+  mx = sum(x for (x, y) in points) / len(points)
+  my = sum(y for (x, y) in points) / len(points)
+  sxx = sum((x - mx) ** 2 for (x, y) in points)
+  if sxx == 0:
+    return None
+  return sum((x - mx) * (y - my) for (x, y) in points) / sxx
+
+# classes whose instances make up the AST
+NODE_CLASSES = (ast.Stmt, ast.Expr, ast.Variable, ast.Field, ast.Type)
+
+class _Unslotted(object):
+  """A plain object, to size a node's attributes as an attribute dict"""
+
+def slot_names(cls):
+  names = []
+  for c in cls.__mro__:
+    names += getattr(c, '__slots__', ())
+  return names
+
+def dict_size(obj, names):
+  '''Bytes obj would take with its attributes in an attribute dict'''
+  plain = _Unslotted()
+  for name in names:
+    if hasattr(obj, name):
+      setattr(plain, name, getattr(obj, name))
+  plain.__dict__.update(getattr(obj, '__dict__', {}))
+  return sys.getsizeof(plain) + sys.getsizeof(plain.__dict__)
+
+def node_memory(source):
+  '''Compiles source; returns {class name: [count, bytes, dict bytes]}
+     for the AST nodes alive once code is generated'''
+  ctx = Context()
+  decafparser.from_string(ctx, source)
+  if ctx.errorflag:
+    raise RuntimeError('generated program has errors: %r' % ctx.diagnostics[:5])
+  code = list(ast.generate_code(ctx))
+  gc.collect()
+  sizes = {}
+  slots = {}
+  for obj in gc.get_objects():
+    if isinstance(obj, NODE_CLASSES):
+      size = sys.getsizeof(obj)
+      attrs = getattr(obj, '__dict__', None)
+      if attrs is not None:
+        size += sys.getsizeof(attrs)
+      cls = type(obj)
+      if cls not in slots:
+        slots[cls] = slot_names(cls)
+      entry = sizes.setdefault(cls.__name__, [0, 0, 0])
+      entry[0] += 1
+      entry[1] += size
+      entry[2] += dict_size(obj, slots[cls])
+  return sizes
+
+def report_memory(params, size, scale='classes'):
+  base = getattr(params, scale)
+  setattr(params, scale, base * size)
+  source = decafgen.generate(params)
+  setattr(params, scale, base)
+  sizes = node_memory(source)
+  print "{0} lines".format(source.count('\n'))
+  print "{0:<22} {1:>9} {2:>12} {3:>10} {4:>12} {5:>10}".format(
+    "class", "nodes", "bytes", "bytes/node", "dict bytes", "bytes/node")
+  row = "{0:<22} {1:>9} {2:>12} {3:>10.1f} {4:>12} {5:>10.1f}"
+  total = [0, 0, 0]
+  for (name, (count, nbytes, dbytes)) in sorted(sizes.items(),
+                                                key=lambda e: -e[1][1]):
+    print row.format(name, count, nbytes, float(nbytes) / count,
+                     dbytes, float(dbytes) / count)
+    total[0] += count
+    total[1] += nbytes
+    total[2] += dbytes
+  if total[0]:
+    print row.format("all", total[0], total[1], float(total[1]) / total[0],
+                     total[2], float(total[2]) / total[0])
+  return 0
+
+# opcodes that are not instructions: labels, comments and directives
+PSEUDO_OPS = (amicode.LABEL, amicode.COMMENT, amicode.STATIC_DATA,
+              amicode.NOP)
+
+def count_instructions(code):
+  '''Instructions in code, an amicode.CodeBuffer, leaving out labels,
+     comments and directives'''
+  return len([op for op in code.columns()[0] if op not in PSEUDO_OPS])
+
+def peephole_counts(source, hits):
+  '''Compiles source; returns its number of instructions before and after
+     the peephole pass, adding the rules' hits to hits'''
+  ctx = Context()
+  decafparser.from_string(ctx, source)
+  if ctx.errorflag:
+    raise RuntimeError('program has errors: %r' % ctx.diagnostics[:5])
+  optimizer = peephole.Peephole()
+  (before, after) = (0, 0)
+  for code in ast.generate_code(ctx):
+    before += count_instructions(code)
+    after += count_instructions(optimizer.optimize_method(code))
+  for (name, n) in optimizer.hits.items():
+    hits[name] = hits.get(name, 0) + n
+  return (before, after)
+
+def time_end_to_end(source, rules, repeat):
+  '''Fastest time over repeat runs of compiling source as decafc.py does,
+     writing the program to /dev/null, with the peephole pass applying
+     rules'''
+  saved = peephole.default_rules
+  peephole.default_rules = rules
+  best = None
+  try:
+    with open(os.devnull, 'w') as sink:
+      for i in range(repeat):
+        gc.collect()
+        start = time.time()
+        decafc.stream_program(source, 'bench', sink, dest=sink)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+          best = elapsed
+  finally:
+    peephole.default_rules = saved
+  return best
+
+def report_peephole(params, sizes, scale='classes', repeat=3):
+  programs = []
+  testdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests')
+  for name in sorted(os.listdir(testdir)):
+    if name.endswith('.decaf'):
+      with open(os.path.join(testdir, name), 'rU') as f:
+        programs.append(('tests/' + name, f.read()))
+  base = getattr(params, scale)
+  for size in sizes:
+    setattr(params, scale, base * size)
+    programs.append(('generated, size {0}'.format(size),
+                     decafgen.generate(params)))
+  setattr(params, scale, base)
+
+  hits = OrderedDict((name, 0) for name in peephole.default_rules)
+  total = [0, 0, 0.0, 0.0]
+  print "{0:<28} {1:>9} {2:>9} {3:>8} {4:>10} {5:>10}".format("program",
+    "before", "after", "saved", "compile s", "no pass s")
+  for (name, source) in programs:
+    try:
+      (before, after) = peephole_counts(source, hits)
+    except Exception, e:
+      # some of the tests do not compile
+      print "{0:<28} {1:>9}  ({2})".format(name, "-", type(e).__name__)
+      continue
+    with_pass = time_end_to_end(source, peephole.default_rules, repeat)
+    without = time_end_to_end(source, [], repeat)
+    print "{0:<28} {1:>9} {2:>9} {3:>7.1f}% {4:>10.3f} {5:>10.3f}".format(
+      name, before, after, 100.0 * (before - after) / max(before, 1),
+      with_pass, without)
+    for (i, n) in enumerate((before, after, with_pass, without)):
+      total[i] += n
+  print "{0:<28} {1:>9} {2:>9} {3:>7.1f}% {4:>10.3f} {5:>10.3f}".format(
+    "all", total[0], total[1], 100.0 * (total[0] - total[1]) / max(total[0], 1),
+    total[2], total[3])
+  print
+  print "{0:<28} {1:>9}".format("rule", "hits")
+  for (name, n) in hits.items():
+    print "{0:<28} {1:>9}".format(name, n)
+  return 0
+
+def run(params, sizes, repeat, ssa, max_exponent, scale='classes'):
+  base = getattr(params, scale)
+  results = []
+  print "{0:>6} {1:>8}  {2}".format("size", "lines",
+    " ".join("{0:>18}".format(name + " s (l/s)") for name in PHASES))
+  for size in sizes:
+    setattr(params, scale, base * size)
+    source = decafgen.generate(params)
+    lines = source.count('\n')
+    best = measure(source, repeat, ssa)
+    results.append((lines, best))
+    cells = []
+    for name in PHASES:
+      t = best[name]
+      if t is None:
+        cells.append("{0:>18}".format("-"))
+      elif t == 0:
+        cells.append("{0:>8.4f} {1:>9}".format(t, "-"))
+      else:
+        cells.append("{0:>8.4f} {1:>9.0f}".format(t, lines / t))
+    print "{0:>6} {1:>8}  {2}".format(size, lines, " ".join(cells))
+  setattr(params, scale, base)
+
+  print
+  flagged = False
+  for name in PHASES:
+    e = exponent([(lines, best[name]) for (lines, best) in results])
+    if e is None:
+      print "{0:<8} exponent -".format(name)
+      continue
+    note = ""
+    if e > max_exponent:
+      note = "  SUPERLINEAR"
+      flagged = True
+    print "{0:<8} exponent {1:.2f}{2}".format(name, e, note)
+  if flagged:
+    return 1
+  return 0
+
+def main(argv=None):
+  if argv is None:
+    argv = sys.argv
+
+  try:
+    try:
+      opts, args = getopt.getopt(argv[1:], "h", ["help", "sizes=", "repeat=",
+                                                 "max-exponent=", "no-ssa",
+                                                 "lexer=", "scale=",
+                                                 "memory", "peephole"]
+                                                + decafgen.PARAM_OPTIONS)
+    except getopt.error, msg:
+      raise Usage(msg)
+    params = decafgen.Params(classes=4)
+    sizes = [1, 2, 4, 8]
+    repeat = 3
+    ssa = True
+    max_exponent = 1.25
+    scale = 'classes'
+    memory = False
+    peephole_report = False
+    for o,a in opts:
+      if o in ("-h", "--help"):
+        print __doc__
+        return 0
+      elif o == "--sizes":
+        try:
+          sizes = [int(s) for s in a.split(',')]
+        except ValueError:
+          raise Usage("Sizes must be integers")
+      elif o == "--repeat":
+        try:
+          repeat = int(a)
+        except ValueError:
+          raise Usage("Number of runs must be an integer")
+        if repeat < 1:
+          raise Usage("Number of runs must be at least 1")
+      elif o == "--max-exponent":
+        try:
+          max_exponent = float(a)
+        except ValueError:
+          raise Usage("Exponent must be a number")
+      elif o == "--no-ssa":
+        ssa = False
+      elif o == "--lexer":
+        if a not in decafparser.LEXERS:
+          raise Usage("Unknown lexer: {0}".format(a))
+        decafparser.lexer_kind = a
+      elif o == "--memory":
+        memory = True
+      elif o == "--peephole":
+        peephole_report = True
+      elif o == "--scale":
+        if a + "=" not in decafgen.PARAM_OPTIONS or a in ("call-density", "seed"):
+          raise Usage("Cannot scale by {0}".format(a))
+        scale = a.replace('-', '_')
+      else:
+        decafgen.set_param(params, o, a)
+    if args:
+      raise Usage("No file name arguments are taken")
+    if memory:
+      return report_memory(params, max(sizes), scale)
+    if peephole_report:
+      return report_peephole(params, sizes, scale, repeat)
+    return run(params, sizes, repeat, ssa, max_exponent, scale)
+  except Usage, err:
+    print >>sys.stderr, err.msg
+    print >>sys.stderr, "For help use --help"
+    return 2
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -1,66 +1,509 @@
 """ Decaf compiler
 A compiler for Decaf programs
-Usage: python decafc.py <filename>
-where <filename> is the name of the file containing the Decaf program.
+Usage: python decafc.py [options] <filename> ...
+where each <filename> is the name of a file containing a Decaf program,
+a directory (every .decaf file below it is compiled) or a glob pattern.
+Giving more than one file switches to batch mode: the files are compiled
+by a pool of worker processes and a per-file summary is printed at the end.
+
+Options:
+  -h, --help          print this message
+  -j N, --jobs=N      number of worker processes in batch mode, or of
+                      concurrent requests with --server
+                      (default: one per CPU)
+  --server=SOCKET     compile through the compile server (decafd.py)
+                      listening on SOCKET instead of in this process
+  --cache=DIR         keep compiled programs in the cache directory DIR
+                      and reuse them while the source, the compiler and
+                      the --lexer and --peephole options are unchanged
+  --cache-size=MB     size limit of the cache directory (default: 256)
+  --stdout            write the program to standard output instead of
+                      <filename>.ami; messages go to standard error
+  --dump-cfg          run the SSA pass and print the control flow graph
+                      after compiling (a single file, and not with
+                      --server or --cache)
+  --time-phases       print wall time, CPU time and memory for each phase
+                      of the compile to standard error (summed over all
+                      files in batch mode)
+  --time-json=FILE    write the phase timings, per file and in total, to
+                      FILE as JSON ("-" for standard output)
+  --lexer=NAME        scanner to use in local compiles: "fast" (the
+                      default) or "ply", the PLY lexer
+  --peephole=RULES    peephole rules to apply in local compiles, separated
+                      by commas, or "none" (default: all of them; see
+                      peephole.py); not with --server
 """
 import sys
+import os
+import glob
 import getopt
-import pprint
+import functools
+from collections import OrderedDict
+from cStringIO import StringIO
+
+import phasetimer
+import amicode
+# decafparser, ast and context are imported when first needed, so that
+# compiles served from the cache or by the compile server never load the
+# parser
 
-import decafparser
-import ast
-import absmc
+# buffer size for writing out programs
+WRITE_BUFFER_SIZE = 64 * 1024
 
 class Usage(Exception):
   def __init__(self, msg):
     self.msg = msg
 
-  
+
+def strip_suffix(fullfilename):
+  if (fullfilename.endswith('.decaf')):
+    (filename,s,e) = fullfilename.rpartition('.')
+  else:
+    filename=fullfilename
+  return filename
+
+def expand_args(args):
+  '''Turn the command line arguments into a list of .decaf files.
+     Returns the list and whether any argument named more than one file.'''
+  files = []
+  expanded = False
+  for arg in args:
+    if os.path.isdir(arg):
+      expanded = True
+      for (dirpath, dirnames, filenames) in os.walk(arg):
+        dirnames.sort()
+        files += [os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith('.decaf')]
+    elif glob.has_magic(arg):
+      expanded = True
+      files += sorted(glob.glob(arg))
+    else:
+      files.append(arg)
+  return (files, expanded)
+
+class CompileResult(object):
+  """The outcome of compiling one program.
+
+     success      True if there were no errors
+     code         the program, in an amicode.CodeBuffer; None if it had
+                  errors
+     cfg          control flow graph: label -> {'predecessors', 'successors'}
+     diagnostics  list of (line, message) pairs
+     static_size  number of cells in the static area
+     context      the Context the program was compiled in"""
+  def __init__(self, ctx, code):
+    self.success = code is not None
+    self.code = code
+    self.cfg = ctx.machine.cfg
+    self.diagnostics = ctx.diagnostics
+    self.static_size = ctx.machine.static_size
+    self.context = ctx
+
+def compile_options(lexer=None, rules=None):
+  '''The options that can change a compile's output, as a string for the
+     cache key: the --lexer name and the list of --peephole rules, None
+     where the option was not given'''
+  if rules is not None:
+    rules = ','.join(rules)
+  return 'lexer={0} peephole={1}'.format(lexer, rules)
+
+def phase(timer, name):
+  '''Times the enclosed statements as phase name if timer is given'''
+  if timer is None:
+    return phasetimer.NO_PHASE
+  return timer.phase(name)
+
+def compile_string(source, timer=None):
+  '''Compiles the Decaf program in source and returns a CompileResult.
+     Nothing is read from or written to disk and nothing is printed.
+     If timer (a phasetimer.PhaseTimer) is given, the phases are timed.'''
+  import decafparser
+  import ast
+  from context import Context
+  ctx = Context()
+  ctx.timer = timer
+  code = None
+  if decafparser.from_string(ctx, source):
+    try:
+      with ctx.phase('codegen'):
+        code = amicode.CodeBuffer(ctx.strings)
+        for method in ctx.peephole.optimize(ast.generate_code(ctx)):
+          code.extend(method)
+        ctx.machine.rebuild_cfg(code)
+    except ast.CodeGenerationError, err:
+      ctx.error(err.lines, err.msg)
+  return CompileResult(ctx, code)
+
+def write_program(code, outfile):
+  '''Writes code to outfile: an amicode.CodeBuffer, or a sequence of
+     them, such as the methods from ast.generate_code()'''
+  if isinstance(code, amicode.CodeBuffer):
+    code = [code]
+  for method in code:
+    method.write(outfile)
+
+def render(code):
+  '''Returns the text of the .ami file for code (see write_program())'''
+  program = StringIO()
+  write_program(code, program)
+  return program.getvalue()
+
+def stream_program(source, filename, out, dest=None, dump_cfg=False,
+                   timer=None):
+  '''Compiles source, writing each method out as soon as it is
+     generated and has been through the peephole pass, instead of
+     building the whole program first.  The program
+     goes to dest if given, otherwise to <filename>.ami, which is only
+     created if the compile succeeds.  Generating, optimizing, formatting
+     and writing happen together and are timed as "emit"; "emit/codegen"
+     is the part spent generating.'''
+  import decafparser
+  import ast
+  from context import Context
+  ctx = Context()
+  ctx.timer = timer
+  success = decafparser.from_string(ctx, source)
+  if success:
+    tmpname = None
+    outfile = dest
+    if dest is None:
+      tmpname = filename + '.ami.tmp'
+      outfile = open(tmpname, 'w', WRITE_BUFFER_SIZE)
+    try:
+      try:
+        methods = ast.generate_code(ctx)
+        if timer is not None:
+          methods = timer.timed_iter('codegen', methods)
+        methods = ctx.peephole.optimize(methods)
+        with ctx.phase('emit'):
+          if dump_cfg:
+            # the SSA pass needs to see all of the program
+            code = amicode.CodeBuffer(ctx.strings)
+          for method in methods:
+            method.write(outfile)
+            if dump_cfg:
+              code.extend(method)
+      finally:
+        if tmpname is not None:
+          outfile.close()
+      if tmpname is not None:
+        os.rename(tmpname, filename + '.ami')
+    except ast.CodeGenerationError, err:
+      ctx.error(err.lines, err.msg)
+      success = False
+    finally:
+      if tmpname is not None and os.path.exists(tmpname):
+        os.unlink(tmpname)
+
+  for (lineno, message) in ctx.diagnostics:
+    print >>out, "{0}: {1}".format(lineno, message)
+  if not success:
+    print >>out, "Failure: there were errors."
+    return False
+
+  if dump_cfg:
+    with ctx.phase('ssa'):
+      ctx.machine.rebuild_cfg(code)
+      ctx.machine.generate_ssa(code)
+
+    with ctx.phase('cfg-dump'):
+      import pprint
+      pprint.pprint(ctx.machine.cfg, out)
+  return True
+
+def compile_file(fullfilename, server=None, out=None, cache=None, dest=None,
+                 dump_cfg=False, timer=None):
+  '''Compiles a single file, writing <name>.ami next to it, or the
+     program to dest if given.  If server is given, the compile is done by
+     the compile server listening on that socket.  If cache (an
+     amicache.Cache) is given, the result is taken from it when possible.
+     The control flow graph is dumped if dump_cfg is set and neither is
+     given.  Messages go to out (default: stdout).  If timer (a
+     phasetimer.PhaseTimer) is given, the phases are timed.  Returns True
+     if there were no errors.'''
+  if out is None:
+    out = sys.stdout
+  filename = strip_suffix(fullfilename)
+  infile = filename + ".decaf"
+  local = server is None and cache is None
+  try:
+    with phase(timer, 'read'):
+      if local:
+        # the scanner can work on the file's pages directly
+        import decafparser
+        source = decafparser.map_file(infile)
+      else:
+        with open(infile, "rU") as f:
+          source = f.read()
+  except IOError as e:
+    print >>out, "I/O error: %s: %s" % (infile, e.strerror)
+    print >>out, "Failure: there were errors."
+    return False
+
+  if local:
+    try:
+      return stream_program(source, filename, out, dest, dump_cfg, timer)
+    finally:
+      if not isinstance(source, str):
+        source.close()
+
+  cached = None
+  if cache is not None:
+    with phase(timer, 'cache'):
+      cached = cache.get(source)
+  if cached is not None:
+    (success, diagnostics, program) = cached
+  elif server is None:
+    result = compile_string(source, timer)
+    (success, diagnostics) = (result.success, result.diagnostics)
+    program = None
+    if success:
+      with phase(timer, 'render'):
+        program = render(result.code)
+  else:
+    import decafd
+    with phase(timer, 'server'):
+      client = decafd.Client(server)
+      try:
+        (success, diagnostics, program) = client.compile(source)
+      finally:
+        client.close()
+  if cache is not None and cached is None:
+    with phase(timer, 'cache'):
+      cache.put(source, success, diagnostics, program)
+
+  for (lineno, message) in diagnostics:
+    print >>out, "{0}: {1}".format(lineno, message)
+  if not success:
+    print >>out, "Failure: there were errors."
+    return False
+
+  with phase(timer, 'write'):
+    if dest is not None:
+      dest.write(program)
+    else:
+      with open(filename + '.ami', 'w') as outfile:
+        outfile.write(program)
+  return True
+
+def batch_compile(fullfilename, server=None, cache=None, timed=False):
+  '''Worker side of batch mode: compiles one file with everything it
+     prints captured, so that output from parallel compiles doesn't mix.
+     Returns the file name, whether it compiled, its output, if timed
+     its phase timings, and the bytes it stored in the cache, for the
+     parent to record.'''
+  import traceback
+  output = StringIO()
+  timer = None
+  if timed:
+    timer = phasetimer.PhaseTimer()
+  if server is not None:
+    # running on one of several threads; nothing else prints
+    try:
+      success = compile_file(fullfilename, server, output, cache,
+                             timer=timer)
+    except Exception:
+      traceback.print_exc(file=output)
+      success = False
+  else:
+    saved = (sys.stdout, sys.stderr)
+    sys.stdout = sys.stderr = output
+    try:
+      try:
+        success = compile_file(fullfilename, cache=cache, timer=timer)
+      except Exception:
+        traceback.print_exc()
+        success = False
+    finally:
+      (sys.stdout, sys.stderr) = saved
+  timings = None
+  if timer is not None:
+    timings = timer.phases
+  stored = 0
+  if cache is not None:
+    stored = cache.take_stored()
+  return (fullfilename, success, output.getvalue(), timings, stored)
+
+def run_batch(files, jobs, server=None, cache=None, timings=None):
+  '''Compiles files in parallel and prints a summary.  If timings (a
+     dictionary) is given, the phase timings of each file are stored in it
+     under the file's name.'''
+  import multiprocessing
+  if jobs is None:
+    jobs = multiprocessing.cpu_count()
+  jobs = min(jobs, len(files))
+  work = functools.partial(batch_compile, server=server, cache=cache,
+                           timed=timings is not None)
+  if jobs == 1:
+    results = (work(f) for f in files)
+  elif server is not None:
+    # the compile server does the work; threads just keep it busy
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(jobs)
+    results = pool.imap(work, files)
+  else:
+    # Workers are forked after the parser has been built, so each of
+    # them starts with the parser tables already loaded and keeps them
+    # for every file it is handed.
+    import decafparser
+    decafparser.get_parser()
+    pool = multiprocessing.Pool(jobs)
+    chunksize = max(1, len(files) // (jobs * 16))
+    results = pool.imap(work, files, chunksize)
+
+  failed = 0
+  for (fullfilename, success, output, file_timings, stored) in results:
+    if cache is not None:
+      cache.stored += stored
+    if timings is not None:
+      timings[fullfilename] = file_timings
+    if success:
+      print "ok      {0}".format(fullfilename)
+    else:
+      failed += 1
+      print "FAILED  {0}".format(fullfilename)
+      for line in output.splitlines():
+        print "        " + line
+  if jobs != 1:
+    pool.close()
+    pool.join()
+
+  if cache is not None:
+    cache.record_size()
+
+  print "{0} succeeded, {1} failed".format(len(files) - failed, failed)
+  if failed:
+    return 1
+  return 0
+
+def report_timings(timings, table, jsonfile):
+  '''Prints the phase timings summed over all files as a table if asked
+     to, and writes them per file and in total to jsonfile if given.'''
+  import json
+  total = phasetimer.PhaseTimer()
+  for phases in timings.values():
+    if phases is not None:
+      total.merge(phases)
+  if table:
+    total.report(sys.stderr)
+  if jsonfile is not None:
+    data = json.dumps({'files': timings, 'total': total.phases}, indent=1)
+    if jsonfile == '-':
+      print data
+    else:
+      with open(jsonfile, 'w') as f:
+        f.write(data + '\n')
+
 def main(argv=None):
   if argv is None:
     argv = sys.argv
-    
+
   # parse command line options
   try:
     try:
-      opts, args = getopt.getopt(argv[1:], "h", ["help"])
+      opts, args = getopt.getopt(argv[1:], "hj:", ["help", "jobs=", "server=",
+                                                   "cache=", "cache-size=",
+                                                   "stdout", "dump-cfg",
+                                                   "time-phases", "time-json=",
+                                                   "lexer=", "peephole="])
     except getopt.error, msg:
       raise Usage(msg)
+    jobs = None
+    server = None
+    cachedir = None
+    cachesize = None
+    to_stdout = False
+    dump_cfg = False
+    time_phases = False
+    time_json = None
+    lexer = None
+    rules = None
     for o,a in opts:
       if o in ("-h", "--help"):
         print __doc__
         return 0
-    if (len(args) != 1):
-      raise Usage("A single file name argument is required")
-    fullfilename = args[0]
-    if (fullfilename.endswith('.decaf')):
-      (filename,s,e) = fullfilename.rpartition('.')
-    else:
-      filename=fullfilename
-    infile = filename + ".decaf"
-    ast.initialize_ast()
-    if decafparser.from_file(infile):
-      try:
-        code = ast.generate_code()
-        program = ''
-        for inst in code:
-          if len(inst) > 1:
-            program += inst[0] + ' '
-            program += ', '.join(inst[1:])
-          else:
-            program += inst[0]
-          program += '\n'
-        with open(filename + '.ami', 'w') as outfile:
-          outfile.write(program)
-        absmc.generate_ssa(code)
-
-        pprint.pprint(absmc.cfg)
-
-      except ast.CodeGenerationError, err:
-        print >>sys.stderr, err.msg
-      
+      elif o in ("-j", "--jobs"):
+        try:
+          jobs = int(a)
+        except ValueError:
+          raise Usage("Number of jobs must be an integer")
+        if jobs < 1:
+          raise Usage("Number of jobs must be at least 1")
+      elif o == "--server":
+        server = a
+      elif o == "--cache":
+        cachedir = a
+      elif o == "--cache-size":
+        try:
+          cachesize = int(a) * 1024 * 1024
+        except ValueError:
+          raise Usage("Cache size must be an integer")
+        if cachesize < 0:
+          raise Usage("Cache size must not be negative")
+      elif o == "--stdout":
+        to_stdout = True
+      elif o == "--dump-cfg":
+        dump_cfg = True
+      elif o == "--time-phases":
+        time_phases = True
+      elif o == "--time-json":
+        time_json = a
+      elif o == "--lexer":
+        import decafparser
+        if a not in decafparser.LEXERS:
+          raise Usage("Unknown lexer: {0}".format(a))
+        decafparser.lexer_kind = lexer = a
+      elif o == "--peephole":
+        import peephole
+        rules = []
+        if a != "none":
+          rules = a.split(',')
+        for name in rules:
+          if name not in peephole.RULES:
+            raise Usage("Unknown peephole rule: {0}".format(name))
+        peephole.default_rules = rules
+    if (len(args) == 0):
+      raise Usage("At least one file name argument is required")
+    if rules is not None and server is not None:
+      raise Usage("--peephole only applies to local compiles")
+    if dump_cfg and (server is not None or cachedir is not None):
+      raise Usage("--dump-cfg only applies to local compiles")
+    cache = None
+    if cachedir is not None:
+      import amicache
+      if cachesize is None:
+        cachesize = amicache.DEFAULT_MAX_SIZE
+      cache = amicache.Cache(cachedir, cachesize, compile_options(lexer, rules))
+    timings = None
+    if time_phases or time_json is not None:
+      timings = OrderedDict()
+    (files, expanded) = expand_args(args)
+    rc = 0
+    if (len(files) == 1 and not expanded):
+      timer = None
+      if timings is not None:
+        timer = phasetimer.PhaseTimer()
+      if to_stdout:
+        compile_file(files[0], server, sys.stderr, cache, sys.stdout,
+                     dump_cfg, timer)
+        sys.stdout.flush()
+      else:
+        compile_file(files[0], server, cache=cache, dump_cfg=dump_cfg,
+                     timer=timer)
+      if cache is not None:
+        cache.record_size()
+      if timer is not None:
+        timings[files[0]] = timer.phases
+    elif (len(files) == 0):
+      raise Usage("No .decaf files found")
+    elif to_stdout:
+      raise Usage("--stdout takes a single file name argument")
+    elif dump_cfg:
+      raise Usage("--dump-cfg takes a single file name argument")
     else:
-      print "Failure: there were errors."
+      rc = run_batch(files, jobs, server, cache, timings)
+    if timings is not None:
+      report_timings(timings, time_phases, time_json)
+    return rc
   except Usage, err:
     print >>sys.stderr, err.msg
     print >>sys.stderr, "For help use --help"
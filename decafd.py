@@ -0,0 +1,170 @@
+""" Decaf compile server
+Keeps the compiler loaded and serves compile requests over a Unix domain
+socket, so that each compile skips interpreter startup and parser setup.
+Usage: python decafd.py [options] <socket>
+where <socket> is the path of the Unix domain socket to listen on.
+Clients are served concurrently, each on its own thread; the compiles
+themselves run in a pool of worker processes that are started with the
+parser tables already loaded.  Use "decafc.py --server=<socket>" to
+compile through a running server.
+
+Options:
+  -h, --help          print this message
+  -j N, --jobs=N      number of compile worker processes
+                      (default: one per CPU)
+
+Protocol: one JSON object per line in each direction.
+  request:  {"source": <program text>}
+  reply:    {"success": <bool>, "diagnostics": [[<line>, <message>], ...],
+             "program": <.ami text, or null on failure>}
+Strings stand for bytes: each character is the byte with its code
+(Latin-1), so programs need not be valid UTF-8.
+"""
+import sys
+import os
+import socket
+import signal
+import json
+import getopt
+
+# programs are bytes; JSON strings carry them a byte per character
+ENCODING = 'latin-1'
+
+class Usage(Exception):
+  def __init__(self, msg):
+    self.msg = msg
+
+
+def compile_request(source):
+  '''Runs in a worker process: compiles one program and returns the
+     reply to send back to the client.'''
+  import decafc
+  try:
+    result = decafc.compile_string(source)
+    program = None
+    if result.success:
+      program = decafc.render(result.code)
+  except Exception, err:
+    return {'success': False,
+            'diagnostics': [[None, 'Internal compiler error: %r' % err]],
+            'program': None}
+  return {'success': result.success,
+          'diagnostics': result.diagnostics,
+          'program': program}
+
+def is_listening(path):
+  '''Whether a server answers on the Unix domain socket at path'''
+  sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  try:
+    sock.connect(path)
+  except socket.error:
+    return False
+  finally:
+    sock.close()
+  return True
+
+def serve(path, jobs=None):
+  import SocketServer
+  import multiprocessing
+  # load the parser before forking so every worker starts warm
+  import decafc
+  import decafparser
+  decafparser.get_parser()
+
+  pool = multiprocessing.Pool(jobs)
+
+  class Handler(SocketServer.StreamRequestHandler):
+    def handle(self):
+      for line in self.rfile:
+        try:
+          request = json.loads(line)
+          source = request['source'].encode(ENCODING)
+        except (ValueError, KeyError, TypeError, AttributeError):
+          reply = {'success': False,
+                   'diagnostics': [[None, 'Malformed request']],
+                   'program': None}
+        else:
+          reply = pool.apply(compile_request, (source,))
+        self.wfile.write(json.dumps(reply, encoding=ENCODING) + '\n')
+        self.wfile.flush()
+
+  class Server(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+  if os.path.exists(path):
+    if is_listening(path):
+      raise Usage("A compile server is already listening on " + path)
+    # left over from a server that is gone
+    os.unlink(path)
+  server = Server(path, Handler)
+  # shut down cleanly, removing the socket, when killed
+  signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+  try:
+    server.serve_forever()
+  finally:
+    server.server_close()
+    os.unlink(path)
+    pool.terminate()
+
+class Client(object):
+  """Connection to a running compile server"""
+  def __init__(self, path):
+    self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    self.sock.connect(path)
+    self.rfile = self.sock.makefile('r')
+    self.wfile = self.sock.makefile('w')
+
+  def compile(self, source):
+    '''Returns (success, diagnostics, program) for the given source.'''
+    self.wfile.write(json.dumps({'source': source}, encoding=ENCODING) + '\n')
+    self.wfile.flush()
+    line = self.rfile.readline()
+    if not line:
+      raise IOError('compile server closed the connection')
+    reply = json.loads(line)
+    diagnostics = [(line, message.encode(ENCODING))
+                   for (line, message) in reply['diagnostics']]
+    program = reply['program']
+    if program is not None:
+      program = program.encode(ENCODING)
+    return (reply['success'], diagnostics, program)
+
+  def close(self):
+    self.rfile.close()
+    self.wfile.close()
+    self.sock.close()
+
+def main(argv=None):
+  if argv is None:
+    argv = sys.argv
+
+  try:
+    try:
+      opts, args = getopt.getopt(argv[1:], "hj:", ["help", "jobs="])
+    except getopt.error, msg:
+      raise Usage(msg)
+    jobs = None
+    for o,a in opts:
+      if o in ("-h", "--help"):
+        print __doc__
+        return 0
+      elif o in ("-j", "--jobs"):
+        try:
+          jobs = int(a)
+        except ValueError:
+          raise Usage("Number of jobs must be an integer")
+        if jobs < 1:
+          raise Usage("Number of jobs must be at least 1")
+    if (len(args) != 1):
+      raise Usage("A single socket path argument is required")
+    try:
+      serve(args[0], jobs)
+    except KeyboardInterrupt:
+      pass
+  except Usage, err:
+    print >>sys.stderr, err.msg
+    print >>sys.stderr, "For help use --help"
+    return 2
+
+if __name__ == "__main__":
+  sys.exit(main())
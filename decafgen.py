@@ -0,0 +1,245 @@
+""" Decaf benchmark program generator
+Writes a synthetic, type-correct Decaf program whose size and shape are
+set by the options, for measuring how the compiler scales.
+Usage: python decafgen.py [options] [<filename>]
+The program goes to <filename> (standard output if none is given).
+
+Options:
+  -h, --help              print this message
+  --classes=N             number of classes (default: 8)
+  --depth=N               length of each inheritance chain (default: 3)
+  --methods=N             methods per class (default: 4)
+  --statements=N          statements per method body (default: 8)
+  --expr-depth=N          nesting depth of expressions (default: 3)
+  --loop-nesting=N        deepest nesting of loops and ifs (default: 2)
+  --call-density=P        chance (0 to 1) that an expression or statement
+                          is a method call (default: 0.2)
+  --seed=N                random seed (default: 1)
+
+The same options and seed always give the same program.  Methods only
+call methods declared before them (in the same class or an ancestor),
+and every class is declared after its superclass.
+"""
+import sys
+import getopt
+import random
+
+class Usage(Exception):
+  def __init__(self, msg):
+    self.msg = msg
+
+
+class Params(object):
+  """Shape of the generated program"""
+  def __init__(self, classes=8, depth=3, methods=4, statements=8,
+               expr_depth=3, loop_nesting=2, call_density=0.2, seed=1):
+    self.classes = classes
+    self.depth = depth
+    self.methods = methods
+    self.statements = statements
+    self.expr_depth = expr_depth
+    self.loop_nesting = loop_nesting
+    self.call_density = call_density
+    self.seed = seed
+
+# instance fields and locals of every generated class/method
+FIELDS = 2
+LOCALS = 3
+
+class Generator(object):
+  def __init__(self, params):
+    self.params = params
+    self.random = random.Random(params.seed)
+    self.lines = []
+    # class name -> (superclass name, [method names]); instance methods
+    # only, each taking two ints and returning an int
+    self.classes = {}
+
+  def emit(self, indent, text):
+    self.lines.append('  ' * indent + text)
+
+  def callable_methods(self, cname):
+    '''Methods a method of cname may call: those already declared in it
+       and in its ancestors'''
+    methods = []
+    while cname is not None:
+      (superclass, declared) = self.classes[cname]
+      methods += declared
+      cname = superclass
+    return methods
+
+  def expr(self, depth, callees):
+    r = self.random
+    if callees and r.random() < self.params.call_density and depth > 0:
+      return 'this.{0}({1}, {2})'.format(r.choice(callees),
+                                         self.expr(depth - 1, callees),
+                                         self.expr(depth - 1, callees))
+    if depth <= 0:
+      choice = r.randint(0, 3)
+      if choice == 0:
+        return str(r.randint(0, 100))
+      elif choice == 1:
+        return 'f{0}'.format(r.randint(0, FIELDS - 1))
+      elif choice == 2:
+        return 'a{0}'.format(r.randint(0, 1))
+      else:
+        return 'x{0}'.format(r.randint(0, LOCALS - 1))
+    op = r.choice(['+', '-', '*', '+'])
+    return '({0} {1} {2})'.format(self.expr(depth - 1, callees), op,
+                                  self.expr(r.randint(0, depth - 1), callees))
+
+  def cond(self, callees):
+    r = self.random
+    op = r.choice(['<', '<=', '>', '>=', '==', '!='])
+    c = '{0} {1} {2}'.format(self.expr(1, callees), op,
+                             self.expr(1, callees))
+    if r.random() < 0.3:
+      c = '{0} && x{1} < {2}'.format(c, r.randint(0, LOCALS - 1),
+                                     r.randint(0, 100))
+    return c
+
+  def stmts(self, indent, count, nesting, callees):
+    r = self.random
+    for i in range(count):
+      kind = r.random()
+      var = 'x{0}'.format(r.randint(0, LOCALS - 1))
+      if nesting < self.params.loop_nesting and kind < 0.1:
+        loopvar = 'i{0}'.format(nesting)
+        self.emit(indent, 'for ({0} = 0; {0} < {1}; {0}++) {{'.format(
+          loopvar, r.randint(1, 10)))
+        self.stmts(indent + 1, 2, nesting + 1, callees)
+        self.emit(indent, '}')
+      elif nesting < self.params.loop_nesting and kind < 0.2:
+        loopvar = 'i{0}'.format(nesting)
+        self.emit(indent, '{0} = 0;'.format(loopvar))
+        self.emit(indent, 'while ({0} < {1}) {{'.format(loopvar,
+                                                       r.randint(1, 10)))
+        self.stmts(indent + 1, 2, nesting + 1, callees)
+        self.emit(indent + 1, '{0} = {0} + 1;'.format(loopvar))
+        self.emit(indent, '}')
+      elif nesting < self.params.loop_nesting and kind < 0.3:
+        self.emit(indent, 'if ({0}) {{'.format(self.cond(callees)))
+        self.stmts(indent + 1, 2, nesting + 1, callees)
+        self.emit(indent, '} else {')
+        self.stmts(indent + 1, 1, nesting + 1, callees)
+        self.emit(indent, '}')
+      elif callees and kind < 0.3 + self.params.call_density * 0.5:
+        self.emit(indent, '{0} = this.{1}({2}, {3});'.format(
+          var, r.choice(callees), self.expr(1, callees),
+          self.expr(1, callees)))
+      elif kind < 0.4:
+        self.emit(indent, 'f{0} = {1};'.format(
+          r.randint(0, FIELDS - 1), self.expr(self.params.expr_depth, callees)))
+      else:
+        self.emit(indent, '{0} = {1};'.format(
+          var, self.expr(self.params.expr_depth, callees)))
+
+  def method(self, cname, mname):
+    callees = self.callable_methods(cname)
+    self.emit(1, 'public int {0}(int a0, int a1) {{'.format(mname))
+    self.emit(2, 'int {0};'.format(', '.join(['x%d' % i for i in range(LOCALS)])))
+    if self.params.loop_nesting > 0:
+      self.emit(2, 'int {0};'.format(
+        ', '.join(['i%d' % i for i in range(self.params.loop_nesting)])))
+    for i in range(LOCALS):
+      self.emit(2, 'x{0} = a{1};'.format(i, i % 2))
+    self.stmts(2, self.params.statements, 0, callees)
+    self.emit(2, 'return x0;')
+    self.emit(1, '}')
+    self.classes[cname][1].append(mname)
+
+  def cls(self, index):
+    cname = 'C{0}'.format(index)
+    superclass = None
+    if index % self.params.depth != 0:
+      superclass = 'C{0}'.format(index - 1)
+    self.classes[cname] = (superclass, [])
+    if superclass is None:
+      self.emit(0, 'class {0} {{'.format(cname))
+      self.emit(1, 'public int {0};'.format(', '.join(['f%d' % i for i in range(FIELDS)])))
+    else:
+      self.emit(0, 'class {0} extends {1} {{'.format(cname, superclass))
+    self.emit(1, 'static int count;')
+    self.emit(1, 'public {0}() {{'.format(cname))
+    for i in range(FIELDS):
+      self.emit(2, 'f{0} = {1};'.format(i, i))
+    self.emit(2, '{0}.count = {0}.count + 1;'.format(cname))
+    self.emit(1, '}')
+    for m in range(self.params.methods):
+      self.method(cname, 'c{0}_m{1}'.format(index, m))
+    self.emit(0, '}')
+
+  def main(self):
+    self.emit(0, 'class Main {')
+    self.emit(1, 'public static void main() {')
+    self.emit(2, 'int r;')
+    self.emit(2, 'r = 0;')
+    for index in range(self.params.classes):
+      cname = 'C{0}'.format(index)
+      self.emit(2, '{0} o{1};'.format(cname, index))
+      self.emit(2, 'o{0} = new {1}();'.format(index, cname))
+      for mname in self.classes[cname][1]:
+        self.emit(2, 'r = r + o{0}.{1}(r, {0});'.format(index, mname))
+    self.emit(2, 'Out.print(r);')
+    self.emit(1, '}')
+    self.emit(0, '}')
+
+  def generate(self):
+    for index in range(self.params.classes):
+      self.cls(index)
+    self.main()
+    return '\n'.join(self.lines) + '\n'
+
+def generate(params):
+  '''Returns the text of a program with the shape given by params'''
+  return Generator(params).generate()
+
+# long options setting the Params, for getopt
+PARAM_OPTIONS = ["classes=", "depth=", "methods=", "statements=", "expr-depth=",
+                 "loop-nesting=", "call-density=", "seed="]
+
+def set_param(params, option, value):
+  '''Sets the Params attribute for a command line option such as
+     "--expr-depth" from its string value'''
+  name = option[2:].replace('-', '_')
+  try:
+    if name == 'call_density':
+      number = float(value)
+    else:
+      number = int(value)
+  except ValueError:
+    raise Usage("Bad value for {0}: {1}".format(option, value))
+  if number < 0 or (name == 'depth' and number < 1):
+    raise Usage("Bad value for {0}: {1}".format(option, value))
+  setattr(params, name, number)
+
+def main(argv=None):
+  if argv is None:
+    argv = sys.argv
+
+  try:
+    try:
+      opts, args = getopt.getopt(argv[1:], "h", ["help"] + PARAM_OPTIONS)
+    except getopt.error, msg:
+      raise Usage(msg)
+    params = Params()
+    for o,a in opts:
+      if o in ("-h", "--help"):
+        print __doc__
+        return 0
+      set_param(params, o, a)
+    if (len(args) > 1):
+      raise Usage("At most one file name argument is allowed")
+    program = generate(params)
+    if args:
+      with open(args[0], 'w') as f:
+        f.write(program)
+    else:
+      sys.stdout.write(program)
+  except Usage, err:
+    print >>sys.stderr, err.msg
+    print >>sys.stderr, "For help use --help"
+    return 2
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -2,8 +2,6 @@
 import ply.lex as lex
 import sys
 
-errorflag = False
-
 reserved = {
    'if' : 'IF',
    'else' : 'ELSE',
@@ -101,10 +99,9 @@ def t_STRING_CONST(t):
 
 # Error handling rule
 def t_error(t):
-  global errorflag
-  print("{1}: Illegal character '{0}'".format(t.value[0], t.lineno))
+  t.lexer.ctx.error(t.lineno, "Illegal character '{0}'".format(t.value[0]))
   t.lexer.skip(1)
-  errorflag = True
+  t.lexer.ctx.errorflag = True
 
 t_ignore  = ' \t'
 
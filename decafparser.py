@@ -1,11 +1,16 @@
 import ply.yacc as yacc
 import decaflexer
+import decafscan
 from decaflexer import tokens
 from decaflexer import lex
 
 import ast
+from context import Context
 
+import os
 import sys
+import copy
+import mmap
 import logging
 precedence = (
   ('right', 'ASSIGN'),
@@ -35,17 +40,6 @@ binops = {
       '>':'gt',
       '>=':'geq'}
 
-def init():
-  decaflexer.errorflag = False
-
-current_type = None
-current_context = None
-current_modifiers = None
-current_class = None
-current_vartable = None
-current_variable_kind = None
-
-
 ### DECAF Grammar
 
 # Top-level
@@ -61,35 +55,45 @@ def p_class_decl_list_empty(p):
 
 def p_class_decl(p):
   'class_decl : class_decl_head LBRACE class_body_decl_list RBRACE'
-  if not current_class.check():
-    decaflexer.errorflag = True
+  ctx = p.parser.ctx
+  ctx.current_class.complete(ctx)
+  with ctx.phase('check'):
+    if not ctx.current_class.check(ctx):
+      ctx.errorflag = True
+  if not ctx.errorflag:
+    with ctx.phase('fold'):
+      ctx.current_class.fold(ctx)
   pass
 
 def p_class_decl_error(p):
   'class_decl : class_decl_head LBRACE error RBRACE'
   # error in class declaration; skip to next class decl.
+  # its fields are still laid out, for its subclasses
+  ctx = p.parser.ctx
+  ctx.current_class.complete(ctx)
   pass
 
 def p_class_decl_head(p):
   'class_decl_head : CLASS ID extends'
-  global current_class, current_context
+  ctx = p.parser.ctx
   cid = p[2]
   sc = p[3]
-  c = ast.lookup(ast.classtable, cid)
+  c = ast.lookup(ctx.classtable, cid)
   if (c != None):
-    signal_error('Class {0} already exists!'.format(cid), p.lineno(2))
+    signal_error(ctx, 'Class {0} already exists!'.format(cid), p.lineno(2))
   else:
     c = ast.Class(cid, sc)
-    ast.addtotable(ast.classtable, cid, c)
-  current_class = c
-  current_context = 'class'
+    ast.addtotable(ctx.classtable, cid, c)
+  ctx.current_class = c
+  ctx.current_context = 'class'
   pass
 
 def p_extends_id(p):
   'extends : EXTENDS ID '
-  cid = ast.lookup(ast.classtable, p[2])
+  ctx = p.parser.ctx
+  cid = ast.lookup(ctx.classtable, p[2])
   if (not cid):
-    signal_error('Class {0} does not exist!'.format(p[2]), p.lineno(2))
+    signal_error(ctx, 'Class {0} does not exist!'.format(p[2]), p.lineno(2))
   p[0] = cid
   pass
 def p_extends_empty(p):
@@ -123,53 +127,53 @@ def p_field_decl(p):
 
 def p_method_decl(p):
   'method_decl : method_header LPAREN param_list_opt RPAREN block'
-  global current_context
+  ctx = p.parser.ctx
   m = p[1]
   m.update_body(p[5])
-  current_context = 'class'
+  ctx.current_context = 'class'
 
 def p_method_decl_header_void(p):
   'method_header : mod VOID ID'
-  global current_context, current_vartable
-  current_context = 'method'
-  (v, s) = current_modifiers
-  m = ast.Method(p[3], current_class, v, s, ast.Type('void'))
-  current_class.add_method(m)
-  current_vartable = m.vars
+  ctx = p.parser.ctx
+  ctx.current_context = 'method'
+  (v, s) = ctx.current_modifiers
+  m = ast.Method(p[3], ctx.current_class, v, s, ctx.types.get('void'), ctx.new_method_id())
+  ctx.current_class.add_method(m)
+  ctx.current_vartable = m.vars
   p[0] = m
 
 def p_method_decl_header_nonvoid(p):
   'method_header : mod type ID'
-  global current_context, current_vartable
-  current_context = 'method'
-  (v, s) = current_modifiers
-  m = ast.Method(p[3], current_class, v, s, current_type)
-  current_class.add_method(m)
-  current_vartable = m.vars
+  ctx = p.parser.ctx
+  ctx.current_context = 'method'
+  (v, s) = ctx.current_modifiers
+  m = ast.Method(p[3], ctx.current_class, v, s, ctx.current_type, ctx.new_method_id())
+  ctx.current_class.add_method(m)
+  ctx.current_vartable = m.vars
   p[0] = m
 
 def p_constructor_decl(p):
   'constructor_decl : constructor_header LPAREN param_list_opt RPAREN block'
-  global current_context
+  ctx = p.parser.ctx
   c = p[1]
   c.update_body(p[5])
-  current_context = 'class'
+  ctx.current_context = 'class'
   
 def p_constructor_header(p):
   'constructor_header : mod ID'
-  global current_context, current_vartable
-  current_context = 'method'
-  (v, s) = current_modifiers
-  c = ast.Constructor(p[2], v)
+  ctx = p.parser.ctx
+  ctx.current_context = 'method'
+  (v, s) = ctx.current_modifiers
+  c = ast.Constructor(p[2], v, ctx.new_constructor_id())
   # note: 's' is ignored.  should we signal error for s?
-  current_class.add_constructor(c)
-  current_vartable = c.vars
+  ctx.current_class.add_constructor(c)
+  ctx.current_vartable = c.vars
   p[0] = c
 
 def p_mod(p):
   'mod : visibility_mod storage_mod'
-  global current_modifiers
-  current_modifiers = (p[1], p[2])
+  ctx = p.parser.ctx
+  ctx.current_modifiers = (p[1], p[2])
 
 def p_visibility_mod_pub(p):
   'visibility_mod : PUBLIC'
@@ -199,50 +203,50 @@ def p_var_decl(p):
 
 def p_type_int(p):
   'type :  INT'
-  global current_type
-  p[0] = current_type = ast.Type('int')
+  ctx = p.parser.ctx
+  p[0] = ctx.current_type = ctx.types.get('int')
 def p_type_bool(p):
   'type :  BOOLEAN'
-  global current_type
-  p[0] = current_type = ast.Type('boolean')
+  ctx = p.parser.ctx
+  p[0] = ctx.current_type = ctx.types.get('boolean')
 def p_type_float(p):
   'type :  FLOAT'
-  global current_type
-  p[0] = current_type = ast.Type('float')
+  ctx = p.parser.ctx
+  p[0] = ctx.current_type = ctx.types.get('float')
 def p_type_id(p):
   'type :  ID'
-  global current_type
-  baseclass = ast.lookup(ast.classtable, p[1])
+  ctx = p.parser.ctx
+  baseclass = ast.lookup(ctx.classtable, p[1])
   if (baseclass == None):
-    signal_error('Class {0} does not exist!'.format(p[1]), p.lineno(1))
+    signal_error(ctx, 'Class {0} does not exist!'.format(p[1]), p.lineno(1))
   else:
-    p[0] = current_type = ast.Type(baseclass.name)
+    p[0] = ctx.current_type = ctx.types.get(baseclass.name)
 
 def p_var_list_plus(p):
   'var_list : var_list COMMA var'
-  p[0] = p[1] + [p[2]]
+  p[1].append(p[3])
+  p[0] = p[1]
 def p_var_list_single(p):
   'var_list : var'
   p[0] = [p[1]]
 
 def p_var_id(p):
   'var : ID dim_star'
-  global current_class, current_context, current_modifiers, current_type
-  global current_vartable, current_variable_kind
-  if (current_context == 'class'):
-    if (current_class.lookup_field(p[1])):
-      signal_error('Duplicate definition of field {0} in class!'.format(p[1]), p.lineno(1))
+  ctx = p.parser.ctx
+  if (ctx.current_context == 'class'):
+    if (ctx.current_class.lookup_field(p[1])):
+      signal_error(ctx, 'Duplicate definition of field {0} in class!'.format(p[1]), p.lineno(1))
     else:
-      (v,s) = current_modifiers
-      f = ast.Field(p[1], current_class, v, s, ast.Type(current_type, params=p[2]))
-      current_class.add_field(p[1], f)
+      (v,s) = ctx.current_modifiers
+      f = ast.Field(p[1], ctx.current_class, v, s, ctx.types.get(ctx.current_type, params=p[2]), ctx.new_field_id())
+      ctx.current_class.add_field(p[1], f)
   else:
     # we're in a method/constructor
-    # Then, current_vartable is the current table of variables
-    if (current_vartable.find_in_current_block(p[1])):
-      signal_error('Duplicate definition of variable {0} within the same block!'.format(p[1]), p.lineno(1))
+    # Then, ctx.current_vartable is the current table of variables
+    if (ctx.current_vartable.find_in_current_block(p[1])):
+      signal_error(ctx, 'Duplicate definition of variable {0} within the same block!'.format(p[1]), p.lineno(1))
     else:
-      current_vartable.add_var(p[1], current_variable_kind, ast.Type(current_type, params=p[2]))
+      ctx.current_vartable.add_var(p[1], ctx.current_variable_kind, ctx.types.get(ctx.current_type, params=p[2]))
 
 def p_param_list_opt(p):
   'param_list_opt : params_begin param_list params_end'
@@ -264,13 +268,13 @@ def p_param(p):
 
 def p_params_begin(p):
   'params_begin : '
-  global current_variable_kind
-  current_variable_kind = 'formal'
+  ctx = p.parser.ctx
+  ctx.current_variable_kind = 'formal'
 
 def p_params_end(p):
   'params_end : '
-  global current_variable_kind
-  current_variable_kind = 'local'
+  ctx = p.parser.ctx
+  ctx.current_variable_kind = 'local'
 
 # Statements
 
@@ -284,20 +288,23 @@ def p_block_error(p):
 
 def p_block_begin(p):
   'block_begin : '
-  global current_vartable
-  current_vartable.enter_block()
+  ctx = p.parser.ctx
+  ctx.current_vartable.enter_block()
   
 def p_block_end(p):
   'block_end : '
-  global current_vartable
-  current_vartable.leave_block()
+  ctx = p.parser.ctx
+  ctx.current_vartable.leave_block()
   
 def p_stmt_list_empty(p):
   'stmt_list : '
   p[0] = []
 def p_stmt_list(p):
   'stmt_list : stmt_list stmt'
-  p[0] = p[1] + [p[2]]
+  # extend the list in place: copying it would make a block of N
+  # statements take O(N^2) to parse
+  p[1].append(p[2])
+  p[0] = p[1]
 
 def p_stmt_if_else(p):
   'stmt : IF LPAREN expr RPAREN stmt ELSE stmt'
@@ -334,7 +341,8 @@ def p_stmt_empty(p):
   p[0] = ast.SkipStmt(p.lineno(1))
 def p_stmt_error(p):
   'stmt : error SEMICOLON'
-  signal_error("Invalid statement", p.lineno(2))
+  ctx = p.parser.ctx
+  signal_error(ctx, "Invalid statement", p.lineno(2))
   p[0] = ast.SkipStmt(p.lineno(2))
 
 # Expressions
@@ -371,12 +379,13 @@ def p_primary_paren(p):
   p[0] = p[2]
 def p_primary_newobj(p):
   'primary : NEW ID LPAREN args_opt RPAREN'
+  ctx = p.parser.ctx
   cname = p[2]
-  c = ast.lookup(ast.classtable, cname)
+  c = ast.lookup(ctx.classtable, cname)
   if (c != None):
     p[0] = ast.NewObjectExpr(c, p[4], p.lineno(1))
   else:
-    signal_error('Class "{0}" in "new" not defined (yet?)'.format(cname), p.lineno(2))
+    signal_error(ctx, 'Class "{0}" in "new" not defined (yet?)'.format(cname), p.lineno(2))
     
 def p_primary_lhs(p):
   'primary : lhs'
@@ -394,7 +403,8 @@ def p_args_opt_empty(p):
 
 def p_args_plus(p):
   'arg_plus : arg_plus COMMA expr'
-  p[0] = p[1] + [p[3]]
+  p[1].append(p[3])
+  p[0] = p[1]
 def p_args_single(p):
   'arg_plus : expr'
   p[0] = [p[1]]
@@ -409,21 +419,22 @@ def p_field_access_dot(p):
   p[0] = ast.FieldAccessExpr(p[1], p[3], p.lineno(2))
 def p_field_access_id(p):
   'field_access : ID'
+  ctx = p.parser.ctx
   vname = p[1]
-  v = current_vartable.find_in_scope(vname)
+  v = ctx.current_vartable.find_in_scope(vname)
   if (v != None):
     # local variable in current scope
     p[0] = ast.VarExpr(v, p.lineno(1))
   else:
-    c = ast.lookup(ast.classtable, vname)
+    c = ast.lookup(ctx.classtable, vname)
     if (c != None):
       # there is a class with this name
       p[0] = ast.ClassReferenceExpr(c, p.lineno(1))
     else:
-      (t, s) = current_modifiers
+      (t, s) = ctx.current_modifiers
       # ref to non-local var, assume static
       if s == 'static':
-        p[0] = ast.FieldAccessExpr(ast.ClassReferenceExpr(current_class, p.lineno(1)), vname, p.lineno(1))
+        p[0] = ast.FieldAccessExpr(ast.ClassReferenceExpr(ctx.current_class, p.lineno(1)), vname, p.lineno(1))
       # reference to non-local var, assume field  
       else:  
         p[0] = ast.FieldAccessExpr(ast.ThisExpr(p.lineno(1)), vname, p.lineno(1))
@@ -438,11 +449,12 @@ def p_method_invocation(p):
     p[0] = ast.MethodInvocationExpr(p[1], p[3], p.lineno(2))
   else:
     # p[1] is a local variable or a class name
+    ctx = p.parser.ctx
     if (isinstance(p[1], ast.VarExpr)):
       name = p[1].var.name
     else:
       name = p[1].classref.name
-    signal_error('Non-method name "{0}" used in a method invocation'.format(name), p.lineno(2))
+    signal_error(ctx, 'Non-method name "{0}" used in a method invocation'.format(name), p.lineno(2))
 
 def p_expr_basic(p):
   '''expr : primary
@@ -492,12 +504,14 @@ def p_assign_pre_dec(p):
 
 def p_new_array(p):
   'new_array : NEW type dim_expr_plus dim_star'
-  t = ast.Type(p[2], params=p[4])
+  ctx = p.parser.ctx
+  t = ctx.types.get(p[2], params=p[4])
   p[0] = ast.NewArrayExpr(t, p[3], p.lineno(1))
 
 def p_dim_expr_plus(p):
   'dim_expr_plus : dim_expr_plus dim_expr'
-  p[0] = p[1] + [p[2]]
+  p[1].append(p[2])
+  p[0] = p[1]
 def p_dim_expr_single(p):
   'dim_expr_plus : dim_expr'
   p[0] = [p[1]]
@@ -534,25 +548,131 @@ def p_expr_empty(p):
 
 
 def p_error(p):
+  # Only here so that yacc finds an error handler when building the
+  # tables; new_parser() gives each compilation a handler of its own.
+  pass
+
+def syntax_error(ctx, p):
   if p is None:
-    signal_error("Unexpected end-of-file", 'end')
+    signal_error(ctx, "Unexpected end-of-file", 'end')
   else:
-    signal_error("Unexpected token '{0}'".format(p.value), p.lineno)
-
-parser = yacc.yacc()
-
-def signal_error(string, lineno):
-  print "{1}: {0}".format(string, lineno)
-  decaflexer.errorflag = True
-  
-def from_file(filename):
+    signal_error(ctx, "Unexpected token '{0}'".format(p.value), p.lineno)
+
+# Precomputed LALR tables, made by build_tables()
+TABLES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      'parsetab.pickle')
+
+parser = None
+
+def get_parser():
+  '''Returns the module-level parser, building it on first use.  The
+     tables are loaded from TABLES as they are, without checking them
+     against the grammar, and nothing is written to disk; if TABLES is
+     missing the tables are computed in memory instead.'''
+  global parser
+  if parser is None:
+    module = sys.modules[__name__]
+    if os.path.exists(TABLES):
+      parser = yacc.yacc(module=module, picklefile=TABLES, optimize=True,
+                         debug=False, errorlog=yacc.NullLogger())
+    else:
+      parser = yacc.yacc(module=module, write_tables=False, debug=False,
+                         errorlog=yacc.NullLogger())
+  return parser
+
+def build_tables():
+  '''Computes the LALR tables from the grammar and saves them to TABLES,
+     with a description of the automaton in parser.out.  Needs to be run
+     whenever the grammar rules change.'''
+  global parser
+  if os.path.exists(TABLES):
+    os.unlink(TABLES)
+  yacc.pickle_protocol = 2
+  parser = yacc.yacc(module=sys.modules[__name__], picklefile=TABLES,
+                     debug=True, outputdir=os.path.dirname(TABLES))
+
+def new_parser(ctx):
+  '''Returns a parser for a single compilation.  It shares the LALR
+     tables with the module-level parser, but has its own parse stacks
+     and reports into ctx, so parsers can be used at the same time.'''
+  p = copy.copy(get_parser())
+  p.ctx = ctx
+  p.errorfunc = lambda tok: syntax_error(ctx, tok)
+  return p
+
+# The scanner new_lexer() hands out: "fast" for decafscan's, "ply" for the
+# PLY lexer built from decaflexer.  Both give the same tokens.
+LEXERS = ('fast', 'ply')
+lexer_kind = 'fast'
+
+lexers = {}
+
+def new_lexer(ctx):
+  '''Returns a lexer for a single compilation, reporting into ctx.  The
+     lexer of each kind is built once, on first use; every compilation
+     gets a clone of it, sharing its compiled regular expressions.'''
+  base = lexers.get(lexer_kind)
+  if base is None:
+    if lexer_kind == 'ply':
+      base = lex.lex(module=decaflexer)
+    else:
+      base = decafscan.Lexer()
+    lexers[lexer_kind] = base
+  l = base.clone()
+  l.lineno = 1
+  l.ctx = ctx
+  return l
+
+def signal_error(ctx, string, lineno):
+  ctx.error(lineno, string)
+  ctx.errorflag = True
+
+def from_string(ctx, data):
+  l = new_lexer(ctx)
+  with ctx.phase('parse'):
+    # the fast scanner does all its work here, so this times the lexing
+    # as a whole; the PLY lexer scans as the parser takes tokens, which
+    # counts as parsing
+    with ctx.phase('lex'):
+      l.input(data)
+    new_parser(ctx).parse(lexer=l, debug=None)
+  return not ctx.errorflag
+
+# Files smaller than this are read into a string: scanning a string is
+# quicker, and the saving in memory only matters for big files
+MAP_MIN_SIZE = 1 << 20
+
+def map_file(filename):
+  '''Returns the contents of filename.  A file of MAP_MIN_SIZE bytes or
+     more comes as a read-only mmap, so it is only paged in as the scanner
+     gets to it and its pages are shared with other processes reading it;
+     a smaller one, or one with "\\r" line ends to translate, comes as a
+     string.  Raises IOError like open().'''
+  data = None
+  with open(filename, "rb") as f:
+    if os.fstat(f.fileno()).st_size >= MAP_MIN_SIZE:
+      try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+      except (ValueError, EnvironmentError):
+        pass
+  if data is not None:
+    if data.find('\r') == -1:
+      return data
+    data.close()
+  with open(filename, "rU") as f:
+    return f.read()
+
+def from_file(ctx, filename):
   try:
-    with open(filename, "rU") as f:
-      init()
-      parser.parse(f.read(), lexer=lex.lex(module=decaflexer), debug=None)
-    return not decaflexer.errorflag
+    data = map_file(filename)
   except IOError as e:
-    print "I/O error: %s: %s" % (filename, e.strerror)
+    signal_error(ctx, "I/O error: %s: %s" % (filename, e.strerror), None)
+    return False
+  try:
+    return from_string(ctx, data)
+  finally:
+    if isinstance(data, mmap.mmap):
+      data.close()
 
 
 if __name__ == "__main__" :
@@ -561,9 +681,11 @@ if __name__ == "__main__" :
       level=logging.CRITICAL,
   )
   log = logging.getLogger()
-  res = parser.parse(f.read(), lexer=lex.lex(module=decaflexer), debug=log)
+  ctx = Context()
+  p = new_parser(ctx)
+  res = p.parse(f.read(), lexer=new_lexer(ctx), debug=log)
 
-  if parser.errorok :
+  if p.errorok :
     print("Parsing succeeded")
   else:
     print("Parsing failed")
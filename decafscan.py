@@ -0,0 +1,264 @@
+""" Fast scanner for Decaf
+A drop-in replacement for the PLY lexer built from decaflexer.  The whole
+input is tokenised in one pass when it is given to input(), into parallel
+arrays of token kinds, values and line numbers; token() then
+hands the tokens to the parser one at a time, so g_token and the parser
+use it exactly like the PLY lexer.
+
+The tokens, their values and line numbers, and the errors reported are
+the same as decaflexer's: the rules below are decaflexer's, in the order
+PLY tries them.  Errors are reported when the parser reaches them, so they
+come out interleaved with syntax errors as before.  Tokens carry no
+lexpos, which nothing in the compiler uses.
+
+The input may also be a buffer such as an mmap of the source file.  The
+scanner then keeps only where each token is, and makes its value from
+the buffer when the parser takes the token, so memory does not grow with
+the size of the file beyond the arrays.
+"""
+import re
+from array import array
+
+from decaflexer import tokens, reserved
+
+# token names, indexed by kind
+KINDS = sorted(set(tokens))
+KIND = dict((name, i) for (i, name) in enumerate(KINDS))
+
+# keyword -> kind; anything else matching the identifier rule is an ID
+KEYWORDS = dict((word, KIND[name]) for (word, name) in reserved.items())
+K_ID = KIND['ID']
+K_INT_CONST = KIND['INT_CONST']
+K_FLOAT_CONST = KIND['FLOAT_CONST']
+K_STRING_CONST = KIND['STRING_CONST']
+
+# operator text -> kind
+OPERATORS = {
+  '.': KIND['DOT'], ',': KIND['COMMA'], ';': KIND['SEMICOLON'],
+  '(': KIND['LPAREN'], ')': KIND['RPAREN'],
+  '{': KIND['LBRACE'], '}': KIND['RBRACE'],
+  '[': KIND['LBRACKET'], ']': KIND['RBRACKET'],
+  '=': KIND['ASSIGN'], '!': KIND['NOT'],
+  '+': KIND['PLUS'], '-': KIND['MINUS'],
+  '*': KIND['MULTIPLY'], '/': KIND['DIVIDE'],
+  '&&': KIND['AND'], '||': KIND['OR'],
+  '==': KIND['EQ'], '!=': KIND['NEQ'],
+  '<': KIND['LT'], '<=': KIND['LEQ'], '>': KIND['GT'], '>=': KIND['GEQ'],
+  '++': KIND['INC'], '--': KIND['DEC'],
+}
+
+# Tokens whose text alone gives their kind: one lookup settles most of
+# the input
+FIXED = dict(KEYWORDS)
+FIXED.update(OPERATORS)
+
+# Splits the input into token texts, dropping the blanks in front of
+# each.  The alternatives are decaflexer's rules in the order PLY tries
+# them (comments before "/", longer operators before shorter ones), and
+# a run of newlines, with the blanks after it, is one piece.  Anything
+# else is a single illegal character.
+PIECES = re.compile(r'''[ \t]*(
+   [a-zA-Z_][a-zA-Z_0-9]*
+  |\n[\n \t]*
+  |/\*[\s\S]*?\*/
+  |\d+\.\d+(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+
+  |\d+
+  |"(?:[^\\"]|\\\\|\\"|\\n|\\t)*"
+  |//[^\n]*
+  |\+\+|--|&&|\|\||==|!=|<=|>=
+  |[^ \t]
+)''', re.VERBOSE)
+
+def scan(data):
+  '''Tokenises data.  Returns arrays of kinds, values and line numbers,
+     and a list of errors as (token index, line, message): each error
+     comes just before the token with that index.'''
+  kinds = array('B')
+  values = []
+  lines = array('i')
+  errors = []
+  lineno = 1
+  fixed = FIXED.get
+  add_kind = kinds.append
+  add_value = values.append
+  add_line = lines.append
+  for text in PIECES.findall(data):
+    kind = fixed(text)
+    if kind is None:
+      c = text[0]
+      if c == '\n':
+        lineno += text.count('\n')
+        continue
+      elif c.isalpha() or c == '_':
+        kind = K_ID
+      elif c.isdigit():
+        if '.' in text or 'e' in text or 'E' in text:
+          kind = K_FLOAT_CONST
+          text = float(text)
+        else:
+          kind = K_INT_CONST
+          text = int(text)
+      elif c == '"' and len(text) > 1:
+        text = text[1:-1]
+        add_kind(K_STRING_CONST)
+        add_value(text)
+        add_line(lineno)
+        # newlines may be embedded in strings
+        lineno += text.count('\n')
+        continue
+      elif c == '/' and len(text) > 1:
+        # comment
+        lineno += text.count('\n')
+        continue
+      else:
+        errors.append((len(kinds), lineno,
+                       "Illegal character '{0}'".format(c)))
+        continue
+    add_kind(kind)
+    add_value(text)
+    add_line(lineno)
+  return (kinds, values, lines, errors)
+
+# text of the tokens whose kind gives it, indexed by kind
+TEXT = [None] * len(KINDS)
+for (text, kind) in FIXED.items():
+  TEXT[kind] = text
+
+def scan_buffer(buf):
+  '''Tokenises a buffer such as an mmap, a piece at a time.  Like scan(),
+     but instead of the values returns an array of where each token starts
+     in buf and one of their lengths, so that only the arrays are kept
+     while scanning and values are made from buf when they are asked
+     for.'''
+  kinds = array('B')
+  starts = array('l')
+  lengths = array('l')
+  lines = array('i')
+  errors = []
+  lineno = 1
+  fixed = FIXED.get
+  add_kind = kinds.append
+  add_start = starts.append
+  add_length = lengths.append
+  add_line = lines.append
+  for m in PIECES.finditer(buf):
+    text = m.group(1)
+    kind = fixed(text)
+    if kind is None:
+      c = text[0]
+      if c == '\n':
+        lineno += text.count('\n')
+        continue
+      elif c.isalpha() or c == '_':
+        kind = K_ID
+      elif c.isdigit():
+        if '.' in text or 'e' in text or 'E' in text:
+          kind = K_FLOAT_CONST
+        else:
+          kind = K_INT_CONST
+      elif c == '"' and len(text) > 1:
+        add_kind(K_STRING_CONST)
+        add_start(m.start(1) + 1)
+        add_length(len(text) - 2)
+        add_line(lineno)
+        lineno += text.count('\n')
+        continue
+      elif c == '/' and len(text) > 1:
+        lineno += text.count('\n')
+        continue
+      else:
+        errors.append((len(kinds), lineno,
+                       "Illegal character '{0}'".format(c)))
+        continue
+    add_kind(kind)
+    add_start(m.start(1))
+    add_length(len(text))
+    add_line(lineno)
+  return (kinds, starts, lengths, lines, errors)
+
+class BufferValues(object):
+  """Token values made from the buffer they were scanned from, as they
+     are asked for"""
+  def __init__(self, buf, kinds, starts, lengths):
+    self.buf = buf
+    self.kinds = kinds
+    self.starts = starts
+    self.lengths = lengths
+
+  def __getitem__(self, i):
+    kind = self.kinds[i]
+    text = TEXT[kind]
+    if text is not None:
+      return text
+    start = self.starts[i]
+    text = self.buf[start:start + self.lengths[i]]
+    if kind == K_INT_CONST:
+      return int(text)
+    elif kind == K_FLOAT_CONST:
+      return float(text)
+    return text
+
+class Token(object):
+  """A token as handed to the parser"""
+  __slots__ = ('type', 'value', 'lineno', 'lexer')
+
+  def __str__(self):
+    return 'LexToken(%s,%r,%d)' % (self.type, self.value, self.lineno)
+
+  def __repr__(self):
+    return str(self)
+
+class Lexer(object):
+  """Scanner with the interface of a PLY lexer, as far as the parser and
+     g_token use it.  Errors go to ctx, like decaflexer's t_error."""
+  def __init__(self):
+    self.ctx = None
+    self.lineno = 1
+    self.input('')
+
+  def clone(self):
+    l = Lexer()
+    l.ctx = self.ctx
+    return l
+
+  def input(self, data):
+    self.lexdata = data
+    if isinstance(data, basestring):
+      (self.kinds, self.values, self.lines, self.errors) = scan(data)
+    else:
+      (self.kinds, starts, lengths, self.lines,
+       self.errors) = scan_buffer(data)
+      self.values = BufferValues(data, self.kinds, starts, lengths)
+    self.index = 0
+    self.next_error = 0
+    self.set_stop()
+
+  def set_stop(self):
+    '''token() only needs to look further at index stop: the next error
+       or the end of the input'''
+    if self.next_error < len(self.errors):
+      self.stop = self.errors[self.next_error][0]
+    else:
+      self.stop = len(self.kinds)
+
+  def report_errors(self, index):
+    while (self.next_error < len(self.errors)
+           and self.errors[self.next_error][0] <= index):
+      (i, lineno, message) = self.errors[self.next_error]
+      self.ctx.error(lineno, message)
+      self.ctx.errorflag = True
+      self.next_error += 1
+    self.set_stop()
+
+  def token(self):
+    i = self.index
+    if i >= self.stop:
+      self.report_errors(i)
+      if i >= len(self.kinds):
+        return None
+    self.index = i + 1
+    t = Token()
+    t.type = KINDS[self.kinds[i]]
+    t.value = self.values[i]
+    t.lineno = self.lines[i]
+    return t
@@ -0,0 +1,473 @@
+""" Peephole optimizer for abstract machine code
+Rewrites short stretches of the generated code into shorter ones, between
+ast.generate_code() and writing the program out.  The code comes a
+method at a time, each in an amicode.CodeBuffer.  A window slides down
+each method, and at every position the rules are tried in turn.  When one
+rewrites the code, the window moves back an instruction, so that one
+rewrite can make room for another: taking out the innermost restore and
+save between two calls can let the next pair out.
+
+A rule is a function rule(p, i), where p is the Peephole doing the work.
+It either rewrites p's method at instruction i and returns True, or
+returns False.  The rule table lists, with each rule, the opcodes it
+starts at; a rule is only tried at instructions with one of those
+opcodes.  Rules only look at the instructions up to p.window after i
+(p.following()).  They read the columns (p.ops, p.args) directly, and
+change them through p.remove() and p.set_operand(): removed instructions
+become NOPs until the method is done, so indexes stay put.  They may also
+use p.reads and p.writes, which count how often each register is read
+and written in the whole method, and p.targets, which counts the jumps
+and branches to each label.  These counts tell whether a temporary is
+used anywhere else, or a label reached other than by falling into it.
+save and restore are left out of the counts: a register that is no
+longer used is still saved and restored around calls, which does no
+harm.
+
+Rules are tried at hundreds of thousands of instructions and seldom
+apply, so the ones that look far ahead first rule out the usual case
+cheaply: p.opcodes, the method's opcodes as a bytearray kept in step
+with p.ops, can be searched with p.find() and p.block_end() at the
+speed of a string search.  The pass skips what no rule starts at,
+including the (opcode, next opcode) pairs in NO_RULE, and only compacts
+a method it changed.
+
+Rules take out jumps, labels and unreachable code, so the control flow
+graph made during code generation no longer fits the code once the pass
+is done: callers that use it remake it from the optimized program with
+AbstractMachine.rebuild_cfg().
+
+Comments are kept in place, and rules skip over them.
+"""
+from bisect import bisect_left
+from collections import OrderedDict
+import re
+
+from amicode import (MOVE, MOVE_IMMED_I, MOVE_IMMED_F, IADD, ISUB, IMUL,
+                     IDIV, IGT, IGEQ, ILT, ILEQ, FADD, FSUB, FMUL, FDIV, FGT,
+                     FGEQ, FLT, FLEQ, FTOI, ITOF, HLOAD, HSTORE, HALLOC, JMP,
+                     BZ, BNZ, CALL, RET, SAVE, RESTORE, LABEL, COMMENT, NOP,
+                     OPERANDS, SAP)
+import amicode
+
+# instructions after the current one that rules may look at: enough to
+# reach from the end of one call to the start of the next
+WINDOW = 64
+
+# opcodes to search for among a method's opcodes
+(SAVE_OP, RESTORE_OP) = (chr(SAVE), chr(RESTORE))
+
+# opcodes that only read their register operands
+READ_ONLY = (HSTORE, SAVE, BZ, BNZ)
+# opcodes that compute a value into their first operand
+COMPUTE = (MOVE, MOVE_IMMED_I, MOVE_IMMED_F, IADD, ISUB, IMUL, IDIV, IGT,
+           IGEQ, ILT, ILEQ, FADD, FSUB, FMUL, FDIV, FGT, FGEQ, FLT, FLEQ,
+           FTOI, ITOF, HLOAD, HALLOC)
+# opcodes where control can leave or enter the code
+ENDS_BLOCK = (LABEL, JMP, CALL, RET, BZ, BNZ)
+
+def _register_columns(op):
+  '''(columns op reads registers from, column it writes a register to
+     or None), columns numbered from 0 for the first operand'''
+  kinds = OPERANDS[op]
+  if not kinds or kinds[0] != 'r':
+    return ((), None)
+  elif op in READ_ONLY:
+    return (tuple(c for c in range(len(kinds)) if kinds[c] == 'r'), None)
+  elif op == RESTORE:
+    return ((), 0)
+  return (tuple(c for c in range(1, len(kinds)) if kinds[c] == 'r'), 0)
+
+# opcode -> columns it reads registers from, and column it writes
+READS = []
+WRITES = []
+for op in range(len(OPERANDS)):
+  (reads, written) = _register_columns(op)
+  READS.append(reads)
+  WRITES.append(written)
+del op, reads, written
+
+### Rules
+
+def self_move(p, i):
+  '''move r, r'''
+  if p.args[0][i] == p.args[1][i]:
+    p.remove(i)
+    return True
+  return False
+
+def jump_to_next(p, i):
+  '''jmp L where L is among the labels right after it'''
+  ops = p.ops
+  label = p.args[0][i]
+  for j in p.following(i):
+    op = ops[j]
+    if op == COMMENT:
+      continue
+    elif op != LABEL:
+      return False
+    elif p.args[0][j] == label:
+      p.remove(i)
+      return True
+  return False
+
+def unreachable(p, i):
+  '''anything after a jmp or ret up to the next label that is jumped to
+     or starts a method: code generation opens a new block after each
+     jmp and ret, which nothing reaches'''
+  j = p.next_inst(i)
+  if j is None:
+    return False
+  if p.ops[j] == LABEL:
+    label = p.args[0][j]
+    if p.targets.get(label) or not p.is_local_label(label):
+      return False
+  p.remove(j)
+  return True
+
+def forward_result(p, i):
+  '''op tB, ...; move x, tB, where tB is not used again: op x, ...'''
+  dest = p.args[0][i]
+  if not amicode.is_temporary(dest) or p.reads.get(dest) != 1 \
+   or p.writes.get(dest) != 1:
+    return False
+  j = p.next_inst(i)
+  if j is None or p.ops[j] != MOVE or p.args[1][j] != dest:
+    return False
+  target = p.args[0][j]
+  p.remove(j)
+  p.set_operand(i, 0, target)
+  return True
+
+def constant_reuse(p, i):
+  '''move_immed_i tA, c; ... move_immed_i tB, c; ... op ..., tB, ... in
+     one block, where tB is used only by op and tA still holds c there:
+     the second load goes, and op reads tA instead'''
+  ops = p.ops
+  (dests, values) = p.args[:2]
+  (a, value) = (dests[i], values[i])
+  # most loads have no other of the same constant in their block: find
+  # that out cheaply first
+  if p.find(MOVE_IMMED_I, 1, value, i + 1, p.block_end(i)) is None:
+    return False
+  load = None
+  for j in p.following(i):
+    op = ops[j]
+    # a save reads its register only to keep a copy
+    if op == COMMENT or op == SAVE:
+      continue
+    if load is None:
+      if op == MOVE_IMMED_I and values[j] == value:
+        b = dests[j]
+        if b != a and amicode.is_temporary(b) and p.reads.get(b) == 1 \
+         and p.writes.get(b) == 1:
+          load = j
+          continue
+    elif b in p.registers_read(j):
+      p.replace_read(j, b, a)
+      p.remove(load)
+      return True
+    if op in ENDS_BLOCK or p.register_written(j) == a:
+      return False
+  return False
+
+def save_restore(p, i):
+  '''restore X ... save X between two calls, where X is neither used
+     between them nor read before the second call, and the saves and
+     restores between them leave X's slot on the stack alone: X keeps
+     its saved copy on the stack instead of taking it off and putting it
+     back'''
+  ops = p.ops
+  reg = p.args[0][i]
+  # most restores come before others (of the arguments, after a call's
+  # result is moved out of a0) with no save in between, or have no save
+  # of the same register after them in their block: find that out
+  # cheaply first
+  end = p.block_end(i)
+  restore = p.opcodes.find(RESTORE_OP, i + 1, end)
+  if restore >= 0 and p.opcodes.find(SAVE_OP, i + 1, restore) < 0:
+    return False
+  elif p.find(SAVE, 0, reg, i + 1, end) is None:
+    return False
+  # saves less restores since the restore
+  depth = 0
+  save = None
+  for k in p.following(i):
+    op = ops[k]
+    if op == COMMENT:
+      continue
+    elif op in ENDS_BLOCK and op != CALL:
+      return False
+    elif save is None:
+      if op == CALL:
+        return False
+      elif op == SAVE:
+        if p.args[0][k] == reg:
+          if depth > 0:
+            return False
+          save = k
+        else:
+          depth += 1
+      elif op == RESTORE:
+        depth -= 1
+        if depth < 0 or p.args[0][k] == reg:
+          return False
+      elif reg in p.registers_read(k) or p.register_written(k) == reg:
+        return False
+    elif op == CALL:
+      # the callee reads its arguments
+      if amicode.is_argument(reg):
+        return False
+      break
+    elif op == RESTORE or reg in p.registers_read(k) \
+     or (op == SAVE and p.args[0][k] == reg):
+      return False
+    elif p.register_written(k) == reg:
+      break
+  else:
+    return False
+  p.remove(save)
+  p.remove(i)
+  return True
+
+# (opcode, opcode of the instruction after it) pairs where no rule
+# applies, which the pass does not stop at: the restores before the last
+# of a run never start save_restore, as with X's copy kept on the stack
+# the next restore would take that off instead of its own
+NO_RULE = frozenset([(RESTORE, RESTORE)])
+
+def _opcode_pattern(opcodes, not_before=()):
+  '''Regular expression matching, in opcodes as a string of bytes, any
+     of opcodes except where followed by one that not_before pairs it
+     with'''
+  def byte_class(ops):
+    return '[' + ''.join('\\x%02x' % op for op in ops) + ']'
+  alone = [op for op in opcodes
+           if not [pair for pair in not_before if pair[0] == op]]
+  parts = [byte_class(alone)] if alone else []
+  for op in sorted(set(opcodes) - set(alone)):
+    after = [pair[1] for pair in not_before if pair[0] == op]
+    parts.append('\\x%02x(?!%s)' % (op, byte_class(after)))
+  return re.compile('|'.join(parts) or '(?!)')
+
+# the instructions Peephole.count() counts: all but saves and restores
+COUNTED = _opcode_pattern(set(range(len(OPERANDS))) - set([SAVE, RESTORE]))
+BLOCK_ENDS = _opcode_pattern(ENDS_BLOCK)
+
+# name -> (opcodes it starts at, rule), in the order they are tried
+RULES = OrderedDict([
+  ('self-move', ((MOVE,), self_move)),
+  ('jump-to-next', ((JMP,), jump_to_next)),
+  ('unreachable', ((JMP, RET), unreachable)),
+  ('forward-result', (COMPUTE, forward_result)),
+  ('constant-reuse', ((MOVE_IMMED_I,), constant_reuse)),
+  ('save-restore', ((RESTORE,), save_restore)),
+])
+
+# names of the rules a Peephole applies unless it is given others
+default_rules = list(RULES)
+
+class Peephole(object):
+  """Applies rules to code as it goes by, and counts how often each one
+     applied in hits (rule name -> count)"""
+  def __init__(self, rules=None, window=WINDOW):
+    if rules is None:
+      rules = default_rules
+    # opcode -> [(name, rule)] to try at instructions with that opcode
+    self.rules = {}
+    for name in rules:
+      (opcodes, rule) = RULES[name]
+      for op in opcodes:
+        self.rules.setdefault(op, []).append((name, rule))
+    self.window = window
+    self.hits = OrderedDict((name, 0) for name in rules)
+    # matches, in a method's opcodes as a string of bytes, the
+    # instructions a rule may apply at
+    self.starts = _opcode_pattern(self.rules, NO_RULE)
+    # the method being optimized, its columns (opcodes, and the three
+    # operand columns), its opcodes again as a bytearray, for searching,
+    # its register counts and how many jumps and branches go to each
+    # label
+    self.code = None
+    self.ops = None
+    self.args = None
+    self.opcodes = None
+    self.reads = None
+    self.writes = None
+    self.targets = None
+    # indexes of the instructions taken out
+    self.removed = None
+
+  def optimize(self, methods):
+    '''Yields each of methods, amicode.CodeBuffers of one method each,
+       with the rules applied'''
+    for code in methods:
+      yield self.optimize_method(code)
+
+  def optimize_method(self, code):
+    '''Applies the rules to code, in place, and returns it'''
+    if not self.rules:
+      return code
+    self.code = code
+    (ops, arg1, arg2, arg3) = code.columns()
+    self.ops = ops
+    self.args = (arg1, arg2, arg3)
+    self.opcodes = bytearray(ops.tostring())
+    self.count_all()
+    rules = self.rules
+    # the instructions a rule may apply at, in order: rules only turn
+    # instructions into NOPs, so no others become one, except that the
+    # one before a rewrite is tried again
+    starts = [m.start() for m in self.starts.finditer(self.opcodes)]
+    self.removed = []
+    k = 0
+    while k < len(starts):
+      i = starts[k]
+      for (name, rule) in rules.get(ops[i], ()):
+        if rule(self, i):
+          self.hits[name] += 1
+          i = self.prev_inst(i)
+          k = bisect_left(starts, i)
+          if ops[i] in rules and (k == len(starts) or starts[k] != i):
+            starts.insert(k, i)
+          break
+      else:
+        k += 1
+    if self.removed:
+      code.compact(self.removed)
+    self.code = self.ops = self.args = self.opcodes = None
+    self.reads = self.writes = self.targets = self.removed = None
+    return code
+
+  def is_local_label(self, label):
+    '''Whether label (a label id) is one of a method's own, L<n>, rather
+       than a method's entry'''
+    return self.code.table.strings[label][0] == 'L'
+
+  def registers_read(self, i):
+    args = self.args
+    return [args[c][i] for c in READS[self.ops[i]] if args[c][i] != SAP]
+
+  def register_written(self, i):
+    c = WRITES[self.ops[i]]
+    if c is None:
+      return None
+    return self.args[c][i]
+
+  def count_all(self):
+    '''Sets reads, writes and targets for the whole method, counting
+       as count() does'''
+    (ops, args) = (self.ops, self.args)
+    reads = self.reads = {}
+    writes = self.writes = {}
+    targets = self.targets = {}
+    for m in COUNTED.finditer(self.opcodes):
+      i = m.start()
+      op = ops[i]
+      if op == JMP:
+        label = args[0][i]
+        targets[label] = targets.get(label, 0) + 1
+        continue
+      elif op == BZ or op == BNZ:
+        label = args[1][i]
+        targets[label] = targets.get(label, 0) + 1
+      for c in READS[op]:
+        reg = args[c][i]
+        if reg != SAP:
+          reads[reg] = reads.get(reg, 0) + 1
+      c = WRITES[op]
+      if c is not None:
+        reg = args[c][i]
+        writes[reg] = writes.get(reg, 0) + 1
+
+  def count(self, i, n):
+    op = self.ops[i]
+    if op == SAVE or op == RESTORE:
+      return
+    elif op == JMP:
+      label = self.args[0][i]
+      self.targets[label] = self.targets.get(label, 0) + n
+      return
+    elif op == BZ or op == BNZ:
+      label = self.args[1][i]
+      self.targets[label] = self.targets.get(label, 0) + n
+    for reg in self.registers_read(i):
+      self.reads[reg] = self.reads.get(reg, 0) + n
+    reg = self.register_written(i)
+    if reg is not None:
+      self.writes[reg] = self.writes.get(reg, 0) + n
+
+  def remove(self, i):
+    '''Takes instruction i out, leaving a NOP in its place'''
+    self.count(i, -1)
+    self.ops[i] = self.opcodes[i] = NOP
+    self.removed.append(i)
+
+  def set_operand(self, i, c, value):
+    '''Sets operand c (from 0) of instruction i to value'''
+    self.count(i, -1)
+    self.args[c][i] = value
+    self.count(i, 1)
+
+  def replace_read(self, i, old, new):
+    '''Makes instruction i read register new where it read old'''
+    for c in READS[self.ops[i]]:
+      if self.args[c][i] == old:
+        self.set_operand(i, c, new)
+
+  def block_end(self, i):
+    '''Index of the first instruction after i that control can leave or
+       enter the code at, or the end of the method'''
+    m = BLOCK_ENDS.search(self.opcodes, i + 1)
+    if m is None:
+      return len(self.opcodes)
+    return m.start()
+
+  def find(self, op, c, value, start, end):
+    '''Index of the first instruction from start up to end with opcode op
+       and value as operand c, or None'''
+    (opcode, column) = (chr(op), self.args[c])
+    j = self.opcodes.find(opcode, start, end)
+    while j >= 0:
+      if column[j] == value:
+        return j
+      j = self.opcodes.find(opcode, j + 1, end)
+    return None
+
+  def following(self, i):
+    '''Yields the indexes of the instructions in the window after i,
+       comments included'''
+    ops = self.ops
+    (j, end, left) = (i + 1, len(ops), self.window)
+    while left > 0 and j < end:
+      if ops[j] != NOP:
+        yield j
+        left -= 1
+      j += 1
+
+  def prev_inst(self, i):
+    '''Index of the last instruction in the window before i that is not
+       a comment, or 0'''
+    ops = self.ops
+    (j, left) = (i - 1, self.window)
+    while left > 0 and j >= 0:
+      op = ops[j]
+      if op != NOP:
+        if op != COMMENT:
+          return j
+        left -= 1
+      j -= 1
+    return 0
+
+  def next_inst(self, i):
+    '''Index of the first instruction after i that is not a comment, if
+       it is within the window'''
+    ops = self.ops
+    (j, end, left) = (i + 1, len(ops), self.window)
+    while left > 0 and j < end:
+      op = ops[j]
+      if op != NOP:
+        if op != COMMENT:
+          return j
+        left -= 1
+      j += 1
+    return None
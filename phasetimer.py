@@ -0,0 +1,128 @@
+""" Per-phase timing
+Keeps wall time, CPU time and memory for each phase of a compile.
+Phases nest: a phase entered while another is running is recorded under
+"<outer>/<inner>", and its time is included in the outer phase's.  A
+phase may be entered many times (once per method for "emit/codegen");
+its figures are then summed over all the calls.
+
+Memory is the high-water mark of the process's resident set (ru_maxrss)
+once the phase is done, and how much that mark went up while the phase
+ran.  Like the times, the rise is summed over all the calls, and over
+all files when timers are merged; the high-water mark is the largest
+seen.  The standard library has no allocation tracing in this version
+of Python, so this is the nearest figure to a per-phase peak.
+"""
+import sys
+import time
+from collections import OrderedDict
+
+try:
+  import resource
+except ImportError:
+  # not available on this platform; memory is reported as 0
+  resource = None
+
+def peak_memory():
+  '''High-water mark of this process's resident memory, in kilobytes'''
+  if resource is None:
+    return 0
+  rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if sys.platform == 'darwin':
+    # reported in bytes there
+    rss //= 1024
+  return rss
+
+class _NoPhase(object):
+  """Stands in for a phase when nothing is being timed"""
+  def __enter__(self):
+    return self
+  def __exit__(self, *exc):
+    return False
+
+NO_PHASE = _NoPhase()
+
+class _Phase(object):
+  def __init__(self, timer, name):
+    self.timer = timer
+    self.name = name
+
+  def __enter__(self):
+    self.timer.start(self.name)
+    return self
+
+  def __exit__(self, *exc):
+    self.timer.stop()
+    return False
+
+class PhaseTimer(object):
+  """Accumulates timings, keyed by phase name in the order first seen.
+     Each entry is a dict with calls, wall and cpu (seconds), peak_kb and
+     growth_kb."""
+  def __init__(self):
+    self.phases = OrderedDict()
+    self.running = []
+
+  def phase(self, name):
+    '''Context manager timing the statements it encloses as phase name'''
+    return _Phase(self, name)
+
+  def start(self, name):
+    if self.running:
+      name = self.running[-1][0] + '/' + name
+    if name not in self.phases:
+      # make an entry now, so outer phases are listed before inner ones
+      self.phases[name] = {'calls': 0, 'wall': 0.0, 'cpu': 0.0,
+                           'peak_kb': 0, 'growth_kb': 0}
+    self.running.append((name, time.time(), time.clock(), peak_memory()))
+
+  def stop(self):
+    (name, wall, cpu, mem) = self.running.pop()
+    wall = time.time() - wall
+    cpu = time.clock() - cpu
+    peak = peak_memory()
+    entry = self.phases[name]
+    entry['calls'] += 1
+    entry['wall'] += wall
+    entry['cpu'] += cpu
+    entry['peak_kb'] = max(entry['peak_kb'], peak)
+    entry['growth_kb'] += peak - mem
+
+  def timed_iter(self, name, iterable):
+    '''Yields from iterable, timing each step as phase name'''
+    it = iter(iterable)
+    while True:
+      self.start(name)
+      try:
+        item = next(it)
+      except StopIteration:
+        self.stop()
+        return
+      except:
+        self.stop()
+        raise
+      self.stop()
+      yield item
+
+  def merge(self, phases):
+    '''Adds in the phases of another timer (e.g. from a batch worker)'''
+    for (name, other) in phases.items():
+      entry = self.phases.get(name)
+      if entry is None:
+        self.phases[name] = dict(other)
+        continue
+      entry['calls'] += other['calls']
+      entry['wall'] += other['wall']
+      entry['cpu'] += other['cpu']
+      entry['peak_kb'] = max(entry['peak_kb'], other['peak_kb'])
+      entry['growth_kb'] += other['growth_kb']
+
+  def report(self, out):
+    '''Prints the phases as a table, nested phases indented'''
+    print >>out, "{0:<24} {1:>8} {2:>10} {3:>10} {4:>10} {5:>10}".format(
+      "phase", "calls", "wall(s)", "cpu(s)", "peak(KB)", "+mem(KB)")
+    for (name, entry) in self.phases.items():
+      depth = name.count('/')
+      label = '  ' * depth + name.rpartition('/')[2]
+      print >>out, "{0:<24} {1:>8} {2:>10.4f} {3:>10.4f} {4:>10} {5:>10}".format(
+        label, entry['calls'], entry['wall'], entry['cpu'],
+        entry['peak_kb'], entry['growth_kb'])